@@ -94,4 +94,25 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+PRODUCT_IMAGE_MAX_SIDE = int(os.getenv('PRODUCT_IMAGE_MAX_SIDE', 1280))
+PRODUCT_IMAGE_QUALITY = int(os.getenv('PRODUCT_IMAGE_QUALITY', 85))
+IMAGE_OPTIMIZER_WORKERS = int(os.getenv('IMAGE_OPTIMIZER_WORKERS', 2))
+
 BOT_TOKEN = os.getenv("BOT_TOKEN")
+
+MAILING_RATE_LIMIT = float(os.getenv('MAILING_RATE_LIMIT', 25))
+MAILING_CONCURRENCY = int(os.getenv('MAILING_CONCURRENCY', 10))
+MAILING_CHUNK_SIZE = int(os.getenv('MAILING_CHUNK_SIZE', 2000))
+MAILING_MAX_RETRIES = int(os.getenv('MAILING_MAX_RETRIES', 3))
+MAILING_CHECKPOINT_SIZE = int(os.getenv('MAILING_CHECKPOINT_SIZE', 500))
+MAILING_CHECKPOINT_INTERVAL = int(os.getenv('MAILING_CHECKPOINT_INTERVAL', 5))
+MAILING_STALE_AFTER = int(os.getenv('MAILING_STALE_AFTER', 300))
+MAILING_SERVICE_CHAT_ID = os.getenv('MAILING_SERVICE_CHAT_ID')
+
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 2))
+JOB_HEARTBEAT_INTERVAL = int(os.getenv('JOB_HEARTBEAT_INTERVAL', 30))
+JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', 300))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', 60))
+
+ORDER_EXPORT_CHUNK_SIZE = int(os.getenv('ORDER_EXPORT_CHUNK_SIZE', 2000))
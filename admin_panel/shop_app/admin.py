@@ -1,26 +1,26 @@
-import asyncio
-import os
-import threading
-
-from aiogram import Bot
-from aiogram.types import FSInputFile
-from asgiref.sync import sync_to_async
-from django.conf import settings
-from django.contrib import admin
+import tempfile
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 from django.urls import path
 from django.utils import timezone
 
-from .models import TelegramUser, Category, Subcategory, Product, Cart, Order, OrderItem, FAQ, Mailing
+from .forms import OrderExportForm
+from .jobs import enqueue_job, has_active_job
+from .models import TelegramUser, Category, Subcategory, Product, Cart, Order, OrderItem, FAQ, Mailing, Job, PaymentEvent
+from .order_export import iter_order_rows, stream_csv, write_xlsx
 
 
 @admin.register(TelegramUser)
 class TelegramUserAdmin(admin.ModelAdmin):
-    list_display = ('id', 'first_name', 'last_name', 'username', 'created_at', 'updated_at')
+    list_display = ('id', 'first_name', 'last_name', 'username', 'is_reachable', 'created_at', 'updated_at')
     search_fields = ('first_name', 'last_name', 'username', 'id')
-    list_filter = ('created_at', 'updated_at')
-    readonly_fields = ('created_at', 'updated_at')
+    list_filter = ('is_reachable', 'created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'unreachable_since')
     list_per_page = 20
 
 
@@ -109,6 +109,40 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline]
     autocomplete_fields = ['user']
 
+    change_list_template = "admin/order_change_list.html"
+
+    def get_urls(self):
+        urls = super().get_urls()
+        my_urls = [
+            path('export/', self.admin_site.admin_view(self.export_orders_view), name='export_orders'),
+        ]
+        return my_urls + urls
+
+    def export_orders_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        form = OrderExportForm(request.GET or None)
+        if not form.is_valid():
+            context = self.admin_site.each_context(request)
+            context['form'] = form
+            context['opts'] = self.model._meta
+            context['has_view_permission'] = self.has_view_permission(request)
+            return TemplateResponse(request, "admin/order_export.html", context)
+
+        rows = iter_order_rows(form.filter_orders(Order.objects.all()))
+        filename = f"orders-{timezone.localtime():%Y%m%d-%H%M%S}"
+
+        if form.cleaned_data['file_format'] == OrderExportForm.FORMAT_CSV:
+            response = StreamingHttpResponse(stream_csv(rows), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
+
+        output = tempfile.TemporaryFile()
+        write_xlsx(output, rows)
+        output.seek(0)
+        return FileResponse(output, as_attachment=True, filename=f"{filename}.xlsx")
+
 
 @admin.register(FAQ)
 class FAQAdmin(admin.ModelAdmin):
@@ -124,13 +158,14 @@ class FAQAdmin(admin.ModelAdmin):
 @admin.register(Mailing)
 class MailingAdmin(admin.ModelAdmin):
     list_display = (
-        '__str__', 'status', 'total_users', 'successful_sends', 'failed_sends',
+        '__str__', 'segment', 'status', 'total_users', 'successful_sends', 'failed_sends',
         'created_at', 'sent_at'
     )
-    list_filter = ('status', 'created_at',)
+    list_filter = ('status', 'segment', 'created_at',)
     search_fields = ('message_text',)
-    readonly_fields = ('status', 'created_at', 'sent_at', 'total_users', 'successful_sends', 'failed_sends',)
-    fields = ('message_text', 'photo')
+    readonly_fields = ('status', 'created_at', 'sent_at', 'total_users', 'successful_sends', 'failed_sends',
+                       'checkpoint_at',)
+    fields = ('message_text', 'photo', 'segment', 'segment_days', 'segment_since')
 
     change_form_template = "admin/mailing_change_form.html"
 
@@ -139,6 +174,8 @@ class MailingAdmin(admin.ModelAdmin):
         my_urls = [
             path('<path:object_id>/send_mailing/', self.admin_site.admin_view(self.send_mailing_view),
                  name='send_mailing'),
+            path('<path:object_id>/resume_mailing/', self.admin_site.admin_view(self.resume_mailing_view),
+                 name='resume_mailing'),
         ]
         return my_urls + urls
 
@@ -149,87 +186,83 @@ class MailingAdmin(admin.ModelAdmin):
             return redirect('admin:shop_app_mailing_change', object_id=object_id)
 
         if request.method != 'POST':
-            context = self.admin_site.each_context(request)
-            context['mailing'] = mailing
-            context['opts'] = self.model._meta
-            context['has_view_permission'] = self.has_view_permission(request, obj=mailing)
-            context['has_add_permission'] = self.has_add_permission(request)
-            context['has_change_permission'] = self.has_change_permission(request, obj=mailing)
-            context['has_delete_permission'] = self.has_delete_permission(request, obj=mailing)
+            return self._render_mailing_confirm(request, mailing)
 
-            return TemplateResponse(request, "admin/send_mailing_confirm.html", context)
+        if not self._launch_mailing(mailing):
+            self.message_user(request, f"Рассылка '{mailing}' уже в очереди или выполняется.", messages.WARNING)
+            return redirect('admin:shop_app_mailing_change', object_id=object_id)
 
-        mailing.status = Mailing.STATUS_SENDING
-        mailing.sent_at = timezone.now()
-        mailing.save()
+        self.message_user(request,
+                          f"Рассылка '{mailing}' поставлена в очередь. Статус будет обновлен по мере отправки.")
+        return redirect('admin:shop_app_mailing_change', object_id=object_id)
 
-        mailing_thread = threading.Thread(target=self._start_mailing_thread, args=(mailing.id,))
-        mailing_thread.daemon = True
-        mailing_thread.start()
+    def resume_mailing_view(self, request, object_id):
+        mailing = self.get_object(request, object_id)
 
-        self.message_user(request,
-                          f"Рассылка '{mailing}' запущена в фоновом режиме. Статус будет обновлен по мере отправки.")
+        if not mailing.is_resumable:
+            return redirect('admin:shop_app_mailing_change', object_id=object_id)
+
+        if request.method != 'POST':
+            return self._render_mailing_confirm(request, mailing, is_resume=True)
+
+        if not self._launch_mailing(mailing):
+            self.message_user(request, f"Рассылка '{mailing}' уже в очереди или выполняется.", messages.WARNING)
+            return redirect('admin:shop_app_mailing_change', object_id=object_id)
+
+        self.message_user(request, f"Рассылка '{mailing}' возобновлена с последней контрольной точки.")
         return redirect('admin:shop_app_mailing_change', object_id=object_id)
 
-    def _start_mailing_thread(self, mailing_id):
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self._perform_mailing(mailing_id))
-        except Exception as e:
-            pass
-
-    async def _perform_mailing(self, mailing_id):
-        mailing = await sync_to_async(Mailing.objects.get)(id=mailing_id)
-
-        all_users = await sync_to_async(list)(TelegramUser.objects.all())
-        mailing.total_users = len(all_users)
-        await sync_to_async(mailing.save)()
-
-        successful_count = 0
-        failed_count = 0
-
-        async with Bot(token=settings.BOT_TOKEN) as bot:
-            if not bot:
-                mailing.status = Mailing.STATUS_FAILED
-                await sync_to_async(mailing.save)()
-                return
-
-            for user in all_users:
-                try:
-                    if mailing.photo:
-                        photo_path = mailing.photo.path
-                        if photo_path and os.path.exists(photo_path):
-                            await bot.send_photo(
-                                chat_id=user.id,
-                                photo=FSInputFile(photo_path),
-                                caption=mailing.message_text,
-                                parse_mode="HTML"
-                            )
-                        else:
-                            await bot.send_message(
-                                chat_id=user.id,
-                                text=mailing.message_text,
-                                parse_mode="HTML"
-                            )
-                    else:
-                        await bot.send_message(
-                            chat_id=user.id,
-                            text=mailing.message_text,
-                            parse_mode="HTML"
-                        )
-                    successful_count += 1
-                    await asyncio.sleep(0.05)
-                except Exception as e:
-                    failed_count += 1
-
-        mailing.successful_sends = successful_count
-        mailing.failed_sends = failed_count
-        if failed_count == mailing.total_users:
-            mailing.status = Mailing.STATUS_FAILED
-        elif successful_count > 0:
-            mailing.status = Mailing.STATUS_SENT
-        else:
-            mailing.status = Mailing.STATUS_FAILED
-
-        await sync_to_async(mailing.save)()
+    def _render_mailing_confirm(self, request, mailing, is_resume=False):
+        context = self.admin_site.each_context(request)
+        context['mailing'] = mailing
+        context['is_resume'] = is_resume
+        context['opts'] = self.model._meta
+        context['has_view_permission'] = self.has_view_permission(request, obj=mailing)
+        context['has_add_permission'] = self.has_add_permission(request)
+        context['has_change_permission'] = self.has_change_permission(request, obj=mailing)
+        context['has_delete_permission'] = self.has_delete_permission(request, obj=mailing)
+
+        return TemplateResponse(request, "admin/send_mailing_confirm.html", context)
+
+    def _launch_mailing(self, mailing) -> bool:
+        with transaction.atomic():
+            Mailing.objects.select_for_update().filter(pk=mailing.pk).first()
+            if has_active_job(Job.KIND_MAILING, mailing_id=mailing.id):
+                return False
+
+            mailing.status = Mailing.STATUS_SENDING
+            mailing.sent_at = mailing.sent_at or timezone.now()
+            mailing.checkpoint_at = timezone.now()
+            mailing.save()
+
+            enqueue_job(Job.KIND_MAILING, mailing_id=mailing.id)
+        return True
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'run_after', 'locked_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('kind', 'payload', 'status', 'attempts', 'run_after', 'locked_at', 'locked_by', 'last_error',
+                       'created_at', 'finished_at')
+    list_per_page = 20
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'payment_id', 'event', 'order', 'status', 'outcome', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('event', 'status', 'outcome', 'created_at')
+    search_fields = ('payment_id', 'order__id')
+    readonly_fields = ('payment_id', 'event', 'payload', 'order', 'outcome', 'status', 'attempts', 'run_after',
+                       'locked_at', 'last_error', 'created_at', 'processed_at')
+    list_select_related = ('order',)
+    list_per_page = 20
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
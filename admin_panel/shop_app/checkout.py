@@ -0,0 +1,57 @@
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.db import transaction
+
+from .models import Cart, Order, OrderItem
+
+
+class PendingCheckout(NamedTuple):
+    order: Order
+    cart_items: list[tuple[int, int]]
+
+
+def create_order_from_cart(user_id: int, delivery_info: str) -> PendingCheckout | None:
+    with transaction.atomic():
+        cart_items = list(
+            Cart.objects.select_for_update(of=('self',))
+            .filter(user_id=user_id)
+            .select_related('product')
+            .order_by('id')
+        )
+        if not cart_items:
+            return None
+
+        order = Order.objects.create(
+            user_id=user_id,
+            delivery_info=delivery_info,
+            total_amount=sum((item.quantity * item.product.price for item in cart_items), Decimal('0')),
+            payment_status=Order.STATUS_PENDING,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=item.product_id,
+                quantity=item.quantity,
+                price_at_purchase=item.product.price,
+            )
+            for item in cart_items
+        ])
+        Cart.objects.filter(id__in=[item.id for item in cart_items]).delete()
+        return PendingCheckout(order, [(item.product_id, item.quantity) for item in cart_items])
+
+
+def attach_payment(checkout: PendingCheckout, payment_id: str) -> None:
+    Order.objects.filter(id=checkout.order.id).update(yookassa_payment_id=payment_id)
+    checkout.order.yookassa_payment_id = payment_id
+
+
+def release_checkout(checkout: PendingCheckout) -> None:
+    with transaction.atomic():
+        Order.objects.filter(id=checkout.order.id, payment_status=Order.STATUS_PENDING).update(
+            payment_status=Order.STATUS_CANCELED,
+        )
+        Cart.objects.bulk_create([
+            Cart(user_id=checkout.order.user_id, product_id=product_id, quantity=quantity)
+            for product_id, quantity in checkout.cart_items
+        ], ignore_conflicts=True)
@@ -0,0 +1,44 @@
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.utils import timezone
+
+from .models import Order
+
+
+class OrderExportForm(forms.Form):
+    FORMAT_XLSX = 'xlsx'
+    FORMAT_CSV = 'csv'
+    FORMAT_CHOICES = [
+        (FORMAT_XLSX, 'Excel (xlsx)'),
+        (FORMAT_CSV, 'CSV'),
+    ]
+
+    date_from = forms.DateField(required=False, label="Дата создания с",
+                                widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, label="Дата создания по",
+                              widget=forms.DateInput(attrs={'type': 'date'}))
+    payment_status = forms.ChoiceField(required=False, label="Статус оплаты",
+                                       choices=[('', 'Все')] + Order.STATUS_CHOICES)
+    file_format = forms.ChoiceField(label="Формат", choices=FORMAT_CHOICES, initial=FORMAT_XLSX)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("Начальная дата не может быть позже конечной.")
+        return cleaned_data
+
+    def filter_orders(self, queryset):
+        date_from = self.cleaned_data.get('date_from')
+        date_to = self.cleaned_data.get('date_to')
+        payment_status = self.cleaned_data.get('payment_status')
+
+        if date_from:
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+        if date_to:
+            next_day = datetime.combine(date_to + timedelta(days=1), time.min)
+            queryset = queryset.filter(created_at__lt=timezone.make_aware(next_day))
+        if payment_status:
+            queryset = queryset.filter(payment_status=payment_status)
+        return queryset
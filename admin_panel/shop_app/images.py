@@ -0,0 +1,35 @@
+import hashlib
+import io
+import os
+
+from PIL import Image, ImageOps
+
+OPTIMIZED_IMAGES_DIR = 'product_images/optimized'
+
+
+def optimize_image(source_path: str, media_root: str, max_side: int, quality: int) -> str:
+    with open(source_path, 'rb') as source:
+        data = source.read()
+
+    name = f"{OPTIMIZED_IMAGES_DIR}/{hashlib.sha256(data).hexdigest()}.jpg"
+    target_path = os.path.join(media_root, name)
+    if os.path.exists(target_path):
+        return name
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.thumbnail((max_side, max_side))
+
+        tmp_path = f"{target_path}.{os.getpid()}.tmp"
+        image.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+        os.replace(tmp_path, target_path)
+
+    return name
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .mailing import run_mailing
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS: dict[str, Callable[..., Awaitable[None]]] = {
+    Job.KIND_MAILING: run_mailing,
+}
+
+
+def enqueue_job(kind: str, **payload) -> Job:
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def has_active_job(kind: str, **payload) -> bool:
+    lookups = {f'payload__{key}': value for key, value in payload.items()}
+    return Job.objects.filter(
+        kind=kind,
+        status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+        **lookups,
+    ).exists()
+
+
+def claim_job(worker_id: str) -> Job | None:
+    close_old_connections()
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.STATUS_QUEUED,
+            run_after__lte=timezone.now(),
+        ).order_by('run_after', 'id').first()
+        if job is None:
+            return None
+
+        job.status = Job.STATUS_RUNNING
+        job.locked_at = timezone.now()
+        job.locked_by = worker_id
+        job.attempts += 1
+        job.save(update_fields=['status', 'locked_at', 'locked_by', 'attempts'])
+        return job
+
+
+def requeue_stale_jobs() -> int:
+    close_old_connections()
+    return Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=settings.JOB_STALE_AFTER),
+    ).update(status=Job.STATUS_QUEUED, locked_at=None, locked_by=None)
+
+
+def touch_job(job: Job) -> None:
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(locked_at=timezone.now())
+
+
+def complete_job(job: Job) -> bool:
+    close_old_connections()
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=Job.STATUS_DONE,
+        locked_at=None,
+        locked_by=None,
+        finished_at=timezone.now(),
+    ) == 1
+
+
+def fail_job(job: Job, error: str) -> bool:
+    close_old_connections()
+    changes = {'last_error': error, 'locked_at': None, 'locked_by': None}
+    if job.attempts < settings.JOB_MAX_ATTEMPTS:
+        changes['status'] = Job.STATUS_QUEUED
+        changes['run_after'] = timezone.now() + timedelta(seconds=settings.JOB_RETRY_DELAY * job.attempts)
+    else:
+        changes['status'] = Job.STATUS_FAILED
+        changes['finished_at'] = timezone.now()
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**changes) == 1
+
+
+def release_job(job: Job) -> None:
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=Job.STATUS_QUEUED,
+        locked_at=None,
+        locked_by=None,
+    )
+
+
+class Worker:
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def run(self) -> None:
+        logger.info("Worker %s started", self.worker_id)
+        while True:
+            try:
+                await sync_to_async(requeue_stale_jobs)()
+                job = await sync_to_async(claim_job)(self.worker_id)
+            except Exception:
+                logger.exception("Worker %s failed to claim a job", self.worker_id)
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: Job) -> None:
+        logger.info("Worker %s running %s", self.worker_id, job)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await JOB_HANDLERS[job.kind](**job.payload)
+        except asyncio.CancelledError:
+            await sync_to_async(release_job)(job)
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            if not await sync_to_async(fail_job)(job, repr(e)):
+                logger.warning("Job %s was taken over by another worker, dropping its failure", job.id)
+        else:
+            if not await sync_to_async(complete_job)(job):
+                logger.warning("Job %s was taken over by another worker, dropping its completion", job.id)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                await sync_to_async(touch_job)(job)
+            except Exception:
+                logger.exception("Failed to heartbeat job %s", job.id)
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import FSInputFile
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Exists, OuterRef
+from django.utils import timezone
+
+from .models import Mailing, MailingDelivery, TelegramUser, Order, Cart
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def build_audience(mailing: Mailing):
+    users = TelegramUser.objects.filter(is_reachable=True)
+    if mailing.segment == Mailing.SEGMENT_HAS_ORDERED:
+        orders = Order.objects.filter(user=OuterRef('pk'), payment_status=Order.STATUS_PAID)
+        users = users.filter(Exists(orders))
+    elif mailing.segment == Mailing.SEGMENT_PAID_WITHIN_DAYS:
+        orders = Order.objects.filter(
+            user=OuterRef('pk'),
+            payment_status=Order.STATUS_PAID,
+            paid_at__gte=timezone.now() - timedelta(days=mailing.segment_days),
+        )
+        users = users.filter(Exists(orders))
+    elif mailing.segment == Mailing.SEGMENT_CART_NOT_EMPTY:
+        users = users.filter(Exists(Cart.objects.filter(user=OuterRef('pk'))))
+    elif mailing.segment == Mailing.SEGMENT_ACTIVE_SINCE:
+        users = users.filter(updated_at__gte=mailing.segment_since)
+    return users
+
+
+def is_unreachable_error(error: TelegramAPIError) -> bool:
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    return isinstance(error, TelegramBadRequest) and 'chat not found' in error.message.lower()
+
+
+@sync_to_async
+def _write_checkpoint(mailing_id: int, deliveries: list[MailingDelivery], unreachable_user_ids: list[int]) -> None:
+    close_old_connections()
+    successful_sends = sum(delivery.status == MailingDelivery.STATUS_SENT for delivery in deliveries)
+    with transaction.atomic():
+        MailingDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+        if unreachable_user_ids:
+            TelegramUser.objects.filter(id__in=unreachable_user_ids).update(
+                is_reachable=False,
+                unreachable_since=timezone.now(),
+            )
+        Mailing.objects.filter(id=mailing_id).update(
+            successful_sends=F('successful_sends') + successful_sends,
+            failed_sends=F('failed_sends') + len(deliveries) - successful_sends,
+            checkpoint_at=timezone.now(),
+        )
+
+
+class MailingEngine:
+    def __init__(self, bot: Bot, mailing: Mailing):
+        self.bot = bot
+        self.mailing = mailing
+        self.limiter = TokenBucket(rate=settings.MAILING_RATE_LIMIT)
+        photo_path = mailing.photo.path if mailing.photo else None
+        self.photo_path = photo_path if photo_path and os.path.exists(photo_path) else None
+        self._deliveries: list[MailingDelivery] = []
+        self._unreachable_user_ids: list[int] = []
+        self._checkpoint_lock = asyncio.Lock()
+
+    def get_recipients(self):
+        delivered = MailingDelivery.objects.filter(mailing=self.mailing, user=OuterRef('pk'))
+        return build_audience(self.mailing).filter(~Exists(delivered)).order_by('id').values_list('id', flat=True)
+
+    @sync_to_async
+    def _get_recipients_page(self, after_id: int) -> list[int]:
+        close_old_connections()
+        return list(self.get_recipients().filter(id__gt=after_id)[:settings.MAILING_CHUNK_SIZE])
+
+    async def run(self) -> None:
+        queue = asyncio.Queue(maxsize=settings.MAILING_CONCURRENCY * 2)
+        try:
+            async with asyncio.TaskGroup() as group:
+                checkpointer = group.create_task(self._run_checkpointer())
+                senders = [group.create_task(self._sender(queue)) for _ in range(settings.MAILING_CONCURRENCY)]
+                await self._produce(queue, len(senders))
+                await asyncio.gather(*senders)
+                checkpointer.cancel()
+        except ExceptionGroup as e:
+            raise e.exceptions[0]
+        finally:
+            await self.checkpoint()
+
+    async def _produce(self, queue: asyncio.Queue, senders_count: int) -> None:
+        if self._needs_photo_upload() and settings.MAILING_SERVICE_CHAT_ID:
+            await self._upload_photo_to_service_chat()
+        after_id = 0
+        while user_ids := await self._get_recipients_page(after_id):
+            for user_id in user_ids:
+                if self._needs_photo_upload():
+                    await self._deliver(user_id)
+                else:
+                    await queue.put(user_id)
+            after_id = user_ids[-1]
+        for _ in range(senders_count):
+            await queue.put(None)
+
+    async def checkpoint(self) -> None:
+        async with self._checkpoint_lock:
+            deliveries, self._deliveries = self._deliveries, []
+            unreachable_user_ids, self._unreachable_user_ids = self._unreachable_user_ids, []
+            if deliveries:
+                await _write_checkpoint(self.mailing.id, deliveries, unreachable_user_ids)
+
+    async def _run_checkpointer(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MAILING_CHECKPOINT_INTERVAL)
+            await self.checkpoint()
+
+    async def _sender(self, queue: asyncio.Queue) -> None:
+        while (user_id := await queue.get()) is not None:
+            await self._deliver(user_id)
+
+    async def _deliver(self, user_id: int) -> None:
+        error_code = await self._send(user_id)
+        self._deliveries.append(MailingDelivery(
+            mailing=self.mailing,
+            user_id=user_id,
+            status=MailingDelivery.STATUS_FAILED if error_code else MailingDelivery.STATUS_SENT,
+            error_code=error_code,
+            sent_at=timezone.now(),
+        ))
+        if len(self._deliveries) >= settings.MAILING_CHECKPOINT_SIZE:
+            await self.checkpoint()
+
+    async def _send(self, user_id: int) -> str | None:
+        for _ in range(settings.MAILING_MAX_RETRIES + 1):
+            await self.limiter.acquire()
+            try:
+                await self._send_message(user_id)
+                return None
+            except TelegramRetryAfter as e:
+                self.limiter.pause(e.retry_after)
+            except TelegramAPIError as e:
+                logger.info("Mailing %s to %s failed: %s", self.mailing.id, user_id, e)
+                if is_unreachable_error(e):
+                    self._unreachable_user_ids.append(user_id)
+                return type(e).__name__
+        return TelegramRetryAfter.__name__
+
+    async def _send_message(self, user_id: int) -> None:
+        if self.mailing.photo_file_id or self.photo_path:
+            message = await self.bot.send_photo(
+                chat_id=user_id,
+                photo=self.mailing.photo_file_id or FSInputFile(self.photo_path),
+                caption=self.mailing.message_text,
+                parse_mode="HTML"
+            )
+            if not self.mailing.photo_file_id:
+                await self._store_photo_file_id(message.photo[-1].file_id)
+        else:
+            await self.bot.send_message(
+                chat_id=user_id,
+                text=self.mailing.message_text,
+                parse_mode="HTML"
+            )
+
+    def _needs_photo_upload(self) -> bool:
+        return bool(self.photo_path) and not self.mailing.photo_file_id
+
+    async def _upload_photo_to_service_chat(self) -> None:
+        try:
+            message = await self.bot.send_photo(
+                chat_id=settings.MAILING_SERVICE_CHAT_ID,
+                photo=FSInputFile(self.photo_path),
+                caption=self.mailing.message_text,
+                parse_mode="HTML"
+            )
+        except TelegramAPIError as e:
+            logger.warning("Failed to upload mailing %s photo to the service chat: %s", self.mailing.id, e)
+            return
+        await self._store_photo_file_id(message.photo[-1].file_id)
+
+    async def _store_photo_file_id(self, file_id: str) -> None:
+        self.mailing.photo_file_id = file_id
+        await Mailing.objects.filter(id=self.mailing.id).aupdate(photo_file_id=file_id)
+
+
+async def run_mailing(mailing_id: int) -> None:
+    await sync_to_async(close_old_connections)()
+    mailing = await Mailing.objects.aget(id=mailing_id)
+
+    try:
+        async with Bot(token=settings.BOT_TOKEN) as bot:
+            engine = MailingEngine(bot, mailing)
+            pending_users = await engine.get_recipients().acount()
+            mailing.status = Mailing.STATUS_SENDING
+            mailing.total_users = mailing.successful_sends + mailing.failed_sends + pending_users
+            await mailing.asave(update_fields=['status', 'total_users'])
+            await engine.run()
+    except Exception:
+        await Mailing.objects.filter(id=mailing_id).aupdate(status=Mailing.STATUS_FAILED)
+        raise
+
+    await mailing.arefresh_from_db()
+    if mailing.successful_sends > 0:
+        mailing.status = Mailing.STATUS_SENT
+    else:
+        mailing.status = Mailing.STATUS_FAILED
+
+    await mailing.asave(update_fields=['status'])
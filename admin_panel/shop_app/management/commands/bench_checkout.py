@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from shop_app.checkout import create_order_from_cart, attach_payment
+from shop_app.models import TelegramUser, Category, Subcategory, Product, Cart
+
+
+class Command(BaseCommand):
+    help = "Measures queries and time per checkout for different cart sizes. All changes are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,10,50,200',
+                            help="Comma-separated cart sizes to benchmark")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        self.stdout.write(f"{'cart size':>10} {'queries':>8} {'time, ms':>10}")
+
+        with transaction.atomic():
+            subcategory = Subcategory.objects.create(
+                category=Category.objects.create(name="bench_checkout"),
+                name="bench_checkout",
+            )
+            products = Product.objects.bulk_create([
+                Product(subcategory=subcategory, name=f"bench_checkout {index}", price=index + 1)
+                for index in range(max(sizes))
+            ])
+            user_id = TelegramUser.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+            for offset, size in enumerate(sizes, 1):
+                user = TelegramUser.objects.create(id=user_id + offset, first_name="bench_checkout")
+                Cart.objects.bulk_create([
+                    Cart(user=user, product=product, quantity=2) for product in products[:size]
+                ])
+
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    checkout = create_order_from_cart(user.id, "bench_checkout")
+                    attach_payment(checkout, f"bench-checkout-{size}")
+                elapsed = (time.perf_counter() - started) * 1000
+
+                self.stdout.write(f"{size:>10} {len(queries):>8} {elapsed:>10.1f}")
+
+            transaction.set_rollback(True)
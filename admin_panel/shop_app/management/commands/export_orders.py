@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from shop_app.order_export import build_xlsx_from_shards
+
+
+class Command(BaseCommand):
+    help = "Builds an orders.xlsx workbook from the monthly CSV export shards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the xlsx file to create")
+        parser.add_argument('--month', action='append', dest='months', metavar='YYYY-MM',
+                            help="Only include the given month (can be repeated)")
+
+    def handle(self, *args, **options):
+        shards_count = build_xlsx_from_shards(options['output'], options['months'])
+        self.stdout.write(f"Exported {shards_count} shard(s) to {options['output']}")
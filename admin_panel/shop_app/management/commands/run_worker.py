@@ -0,0 +1,29 @@
+import asyncio
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from shop_app.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = "Runs mailings and other background jobs from the job queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        asyncio.run(self._run(Worker(poll_interval=options['poll_interval'])))
+
+    async def _run(self, worker: Worker):
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await worker.run()
+        except asyncio.CancelledError:
+            self.stdout.write("Worker stopped")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0002_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_file_id',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Telegram file_id изображения'),
+        ),
+    ]
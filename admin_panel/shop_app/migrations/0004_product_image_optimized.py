@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0003_product_image_file_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_optimized',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='product_images/optimized/', verbose_name='Оптимизированное изображение'),
+        ),
+    ]
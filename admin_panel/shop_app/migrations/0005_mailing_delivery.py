@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0004_product_image_optimized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mailing',
+            name='checkpoint_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Последняя контрольная точка'),
+        ),
+        migrations.CreateModel(
+            name='MailingDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('sent', 'Отправлено'), ('failed', 'Ошибка отправки')], max_length=10, verbose_name='Статус')),
+                ('error_code', models.CharField(blank=True, max_length=100, null=True, verbose_name='Код ошибки')),
+                ('sent_at', models.DateTimeField(verbose_name='Дата отправки')),
+                ('mailing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='shop_app.mailing', verbose_name='Рассылка')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mailing_deliveries', to='shop_app.telegramuser', verbose_name='Пользователь Telegram')),
+            ],
+            options={
+                'verbose_name': 'Доставка рассылки',
+                'verbose_name_plural': 'Доставки рассылки',
+                'unique_together': {('mailing', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0007_mailing_photo_file_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='telegramuser',
+            name='is_reachable',
+            field=models.BooleanField(default=True, verbose_name='Доступен для сообщений'),
+        ),
+        migrations.AddField(
+            model_name='telegramuser',
+            name='unreachable_since',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Недоступен с'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramuser',
+            index=models.Index(condition=models.Q(('is_reachable', True)), fields=['id'], name='tg_user_reachable_idx'),
+        ),
+    ]
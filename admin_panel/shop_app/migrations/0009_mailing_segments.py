@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0008_telegramuser_reachability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mailing',
+            name='segment',
+            field=models.CharField(choices=[('all', 'Все пользователи'), ('has_ordered', 'Совершали покупки'), ('paid_within', 'Оплачивали заказ за последние N дней'), ('cart_not_empty', 'Есть товары в корзине'), ('active_since', 'Активны с указанной даты')], default='all', max_length=20, verbose_name='Аудитория'),
+        ),
+        migrations.AddField(
+            model_name='mailing',
+            name='segment_days',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Количество дней (N)'),
+        ),
+        migrations.AddField(
+            model_name='mailing',
+            name='segment_since',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Активны с'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'payment_status', 'paid_at'], name='order_user_status_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramuser',
+            index=models.Index(fields=['updated_at'], name='tg_user_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0010_paymentevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentevent',
+            name='order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_events', to='shop_app.order', verbose_name='Заказ'),
+        ),
+        migrations.AddField(
+            model_name='paymentevent',
+            name='outcome',
+            field=models.CharField(blank=True, choices=[('applied', 'Статус заказа обновлен'), ('skipped', 'Без изменений'), ('ignored', 'Событие не обрабатывается')], max_length=10, null=True, verbose_name='Результат'),
+        ),
+    ]
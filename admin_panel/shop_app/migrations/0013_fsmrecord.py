@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0012_order_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FSMRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='Ключ')),
+                ('state', models.CharField(blank=True, max_length=255, null=True, verbose_name='Состояние')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Данные')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Состояние диалога',
+                'verbose_name_plural': 'Состояния диалогов',
+            },
+        ),
+    ]
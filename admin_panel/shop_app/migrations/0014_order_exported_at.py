@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:36
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_paid_orders_exported(apps, schema_editor):
+    Order = apps.get_model('shop_app', 'Order')
+    Order.objects.filter(payment_status='paid').update(exported_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0013_fsmrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='exported_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата выгрузки'),
+        ),
+        migrations.RunPython(mark_paid_orders_exported, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('exported_at__isnull', True), ('payment_status', 'paid')), fields=['paid_at', 'id'], name='order_export_pending_idx'),
+        ),
+    ]
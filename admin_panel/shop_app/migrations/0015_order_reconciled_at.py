@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop_app', '0014_order_exported_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='reconciled_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата сверки с ЮKassa'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('payment_status', 'pending')), fields=['reconciled_at', 'created_at'], name='order_reconcile_idx'),
+        ),
+    ]
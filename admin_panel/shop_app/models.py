@@ -1,5 +1,10 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 
 class TelegramUser(models.Model):
@@ -9,11 +14,17 @@ class TelegramUser(models.Model):
     username = models.CharField(max_length=255, blank=True, null=True, verbose_name="Username")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата последнего обновления")
+    is_reachable = models.BooleanField(default=True, verbose_name="Доступен для сообщений")
+    unreachable_since = models.DateTimeField(blank=True, null=True, verbose_name="Недоступен с")
 
     class Meta:
         verbose_name = "Пользователь Telegram"
         verbose_name_plural = "Пользователи Telegram"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(is_reachable=True), name='tg_user_reachable_idx'),
+            models.Index(fields=['updated_at'], name='tg_user_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name or ''} {self.last_name or ''} | @{self.username or 'отсутствует'} | id: {self.id}"
@@ -56,6 +67,10 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)],
                                 verbose_name="Цена")
     image = models.ImageField(upload_to='product_images/', blank=True, null=True, verbose_name="Изображение товара")
+    image_optimized = models.ImageField(upload_to='product_images/optimized/', blank=True, null=True, editable=False,
+                                        verbose_name="Оптимизированное изображение")
+    image_file_id = models.CharField(max_length=255, blank=True, null=True, editable=False,
+                                     verbose_name="Telegram file_id изображения")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата последнего обновления")
 
@@ -68,6 +83,18 @@ class Product(models.Model):
         return self.name
 
 
+class CatalogVersion(models.Model):
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Версия")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата последнего обновления")
+
+    class Meta:
+        verbose_name = "Версия каталога"
+        verbose_name_plural = "Версии каталога"
+
+    def __str__(self):
+        return f"Версия каталога {self.version}"
+
+
 class Cart(models.Model):
     user = models.ForeignKey(TelegramUser, on_delete=models.CASCADE, related_name='cart_items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -105,11 +132,21 @@ class Order(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     paid_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата оплаты")
+    exported_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата выгрузки")
+    reconciled_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата сверки с ЮKassa")
 
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'payment_status', 'paid_at'], name='order_user_status_paid_idx'),
+            models.Index(fields=['payment_status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['paid_at', 'id'], name='order_export_pending_idx',
+                         condition=models.Q(payment_status='paid', exported_at__isnull=True)),
+            models.Index(fields=['reconciled_at', 'created_at'], name='order_reconcile_idx',
+                         condition=models.Q(payment_status='pending')),
+        ]
 
     def __str__(self):
         return f"Заказ #{self.id} от {self.user.username or self.user.id} ({self.get_payment_status_display()})"
@@ -160,15 +197,34 @@ class Mailing(models.Model):
         (STATUS_FAILED, 'Ошибка отправки'),
     ]
 
+    SEGMENT_ALL = 'all'
+    SEGMENT_HAS_ORDERED = 'has_ordered'
+    SEGMENT_PAID_WITHIN_DAYS = 'paid_within'
+    SEGMENT_CART_NOT_EMPTY = 'cart_not_empty'
+    SEGMENT_ACTIVE_SINCE = 'active_since'
+    SEGMENT_CHOICES = [
+        (SEGMENT_ALL, 'Все пользователи'),
+        (SEGMENT_HAS_ORDERED, 'Совершали покупки'),
+        (SEGMENT_PAID_WITHIN_DAYS, 'Оплачивали заказ за последние N дней'),
+        (SEGMENT_CART_NOT_EMPTY, 'Есть товары в корзине'),
+        (SEGMENT_ACTIVE_SINCE, 'Активны с указанной даты'),
+    ]
+
     message_text = models.TextField(verbose_name="Текст сообщения")
     photo = models.ImageField(upload_to='mailing_photos/', blank=True, null=True,
                               verbose_name="Изображение для рассылки")
+    photo_file_id = models.CharField(max_length=255, blank=True, null=True, editable=False,
+                                     verbose_name="Telegram file_id изображения")
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES, default=SEGMENT_ALL, verbose_name="Аудитория")
+    segment_days = models.PositiveIntegerField(blank=True, null=True, verbose_name="Количество дней (N)")
+    segment_since = models.DateTimeField(blank=True, null=True, verbose_name="Активны с")
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_DRAFT, verbose_name="Статус")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     sent_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата отправки")
     total_users = models.PositiveIntegerField(default=0, verbose_name="Всего пользователей")
     successful_sends = models.PositiveIntegerField(default=0, verbose_name="Успешных отправок")
     failed_sends = models.PositiveIntegerField(default=0, verbose_name="Неудачных отправок")
+    checkpoint_at = models.DateTimeField(blank=True, null=True, verbose_name="Последняя контрольная точка")
 
     class Meta:
         verbose_name = "Рассылка"
@@ -177,3 +233,147 @@ class Mailing(models.Model):
 
     def __str__(self):
         return f"Рассылка от {self.created_at.strftime('%Y-%m-%d %H:%M')} ({self.get_status_display()})"
+
+    def clean(self):
+        if self.segment == self.SEGMENT_PAID_WITHIN_DAYS and not self.segment_days:
+            raise ValidationError({'segment_days': "Укажите количество дней для выбранной аудитории."})
+        if self.segment == self.SEGMENT_ACTIVE_SINCE and not self.segment_since:
+            raise ValidationError({'segment_since': "Укажите дату для выбранной аудитории."})
+
+    @property
+    def is_resumable(self):
+        if self.status == self.STATUS_FAILED:
+            return True
+        if self.status != self.STATUS_SENDING:
+            return False
+        last_activity = self.checkpoint_at or self.sent_at
+        return not last_activity or timezone.now() - last_activity > timedelta(seconds=settings.MAILING_STALE_AFTER)
+
+
+class MailingDelivery(models.Model):
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_SENT, 'Отправлено'),
+        (STATUS_FAILED, 'Ошибка отправки'),
+    ]
+
+    mailing = models.ForeignKey(Mailing, on_delete=models.CASCADE, related_name='deliveries',
+                                verbose_name="Рассылка")
+    user = models.ForeignKey(TelegramUser, on_delete=models.CASCADE, related_name='mailing_deliveries',
+                             verbose_name="Пользователь Telegram")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, verbose_name="Статус")
+    error_code = models.CharField(max_length=100, blank=True, null=True, verbose_name="Код ошибки")
+    sent_at = models.DateTimeField(verbose_name="Дата отправки")
+
+    class Meta:
+        verbose_name = "Доставка рассылки"
+        verbose_name_plural = "Доставки рассылки"
+        unique_together = ('mailing', 'user')
+
+    def __str__(self):
+        return f"Рассылка #{self.mailing_id} -> {self.user_id} ({self.get_status_display()})"
+
+
+class Job(models.Model):
+    KIND_MAILING = 'mailing'
+    KIND_CHOICES = [
+        (KIND_MAILING, 'Рассылка'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'В очереди'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_DONE, 'Выполнено'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES, verbose_name="Тип задачи")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Параметры")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name="Статус")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попыток")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Запустить после")
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name="Взята в работу")
+    locked_by = models.CharField(max_length=255, blank=True, null=True, verbose_name="Обработчик")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата завершения")
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"Задача #{self.id} {self.get_kind_display()} ({self.get_status_display()})"
+
+
+class PaymentEvent(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_PROCESSED = 'processed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает обработки'),
+        (STATUS_PROCESSING, 'Обрабатывается'),
+        (STATUS_PROCESSED, 'Обработано'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+
+    OUTCOME_APPLIED = 'applied'
+    OUTCOME_SKIPPED = 'skipped'
+    OUTCOME_IGNORED = 'ignored'
+    OUTCOME_CHOICES = [
+        (OUTCOME_APPLIED, 'Статус заказа обновлен'),
+        (OUTCOME_SKIPPED, 'Без изменений'),
+        (OUTCOME_IGNORED, 'Событие не обрабатывается'),
+    ]
+
+    payment_id = models.CharField(max_length=64, verbose_name="ID платежа ЮKassa")
+    event = models.CharField(max_length=64, verbose_name="Событие")
+    payload = models.JSONField(verbose_name="Уведомление")
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, blank=True, null=True, related_name='payment_events',
+                              verbose_name="Заказ")
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES, blank=True, null=True, verbose_name="Результат")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Статус")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попыток")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Обработать после")
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name="Взято в работу")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата получения")
+    processed_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата обработки")
+
+    class Meta:
+        verbose_name = "Платежное уведомление"
+        verbose_name_plural = "Платежные уведомления"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['payment_id', 'event'], name='payment_event_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='payment_event_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.payment_id} ({self.get_status_display()})"
+
+
+class FSMRecord(models.Model):
+    key = models.CharField(max_length=255, unique=True, verbose_name="Ключ")
+    state = models.CharField(max_length=255, blank=True, null=True, verbose_name="Состояние")
+    data = models.JSONField(default=dict, blank=True, verbose_name="Данные")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    class Meta:
+        verbose_name = "Состояние диалога"
+        verbose_name_plural = "Состояния диалогов"
+
+    def __str__(self):
+        return f"{self.key} ({self.state or '-'})"
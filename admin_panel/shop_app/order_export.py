@@ -0,0 +1,153 @@
+import csv
+import fcntl
+import glob
+import os
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+
+from .models import Order
+
+EXPORT_HEADERS = [
+    "Номер заказа", "Дата создания", "Время создания", "Дата оплаты", "Время оплаты",
+    "Пользователь (ID)", "Имя пользователя", "Username",
+    "Данные доставки", "Список товаров", "Общая сумма",
+    "Статус оплаты", "ID платежа ЮKassa"
+]
+EXPORT_COLUMN_WIDTHS = [14, 14, 14, 14, 14, 18, 20, 20, 40, 60, 14, 16, 40]
+NUMERIC_COLUMNS = {0: int, 5: int, 10: float}
+
+SHARD_PREFIX = 'orders-'
+
+
+def get_export_dir() -> str:
+    return os.path.join(settings.MEDIA_ROOT, 'orders_export')
+
+
+def get_shard_path(order: Order) -> str:
+    moment = order.paid_at or order.created_at
+    return os.path.join(get_export_dir(), f"{SHARD_PREFIX}{moment:%Y-%m}.csv")
+
+
+def list_shards(months=None) -> list[str]:
+    shards = sorted(glob.glob(os.path.join(get_export_dir(), f"{SHARD_PREFIX}*.csv")))
+    if months:
+        shards = [path for path in shards if os.path.basename(path)[len(SHARD_PREFIX):-4] in months]
+    return shards
+
+
+def order_to_row(order: Order) -> list:
+    products_list = []
+    for item in order.items.all():
+        product_name = item.product.name if item.product else 'Удаленный товар'
+        products_list.append(f"{product_name} ({item.quantity} шт. по {item.price_at_purchase}₽)")
+
+    return [
+        order.id,
+        order.created_at.strftime("%Y-%m-%d") if order.created_at else "",
+        order.created_at.strftime("%H:%M:%S") if order.created_at else "",
+        order.paid_at.strftime("%Y-%m-%d") if order.paid_at else "",
+        order.paid_at.strftime("%H:%M:%S") if order.paid_at else "",
+        order.user.id if order.user else 'N/A',
+        order.user.first_name if order.user else 'N/A',
+        order.user.username if order.user else 'N/A',
+        order.delivery_info,
+        "\n".join(products_list),
+        float(order.total_amount),
+        order.get_payment_status_display(),
+        order.yookassa_payment_id or '',
+    ]
+
+
+def append_orders(orders) -> None:
+    orders = list(orders)
+    prefetch_related_objects(orders, 'user', 'items__product')
+    rows_by_shard = {}
+    for order in orders:
+        rows_by_shard.setdefault(get_shard_path(order), []).append(order_to_row(order))
+
+    os.makedirs(get_export_dir(), exist_ok=True)
+    for path, rows in rows_by_shard.items():
+        with open(path, 'a', newline='', encoding='utf-8-sig') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0, os.SEEK_END)
+                writer = csv.writer(file)
+                if file.tell() == 0:
+                    writer.writerow(EXPORT_HEADERS)
+                writer.writerows(rows)
+                file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def append_order(order: Order) -> None:
+    append_orders([order])
+
+
+def iter_order_rows(orders):
+    queryset = orders.select_related('user').prefetch_related('items__product').order_by('id')
+    for order in queryset.iterator(chunk_size=settings.ORDER_EXPORT_CHUNK_SIZE):
+        yield order_to_row(order)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(EXPORT_HEADERS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _parse_csv_row(row: list) -> list:
+    for index, cast in NUMERIC_COLUMNS.items():
+        try:
+            row[index] = cast(row[index])
+        except (ValueError, IndexError):
+            pass
+    return row
+
+
+def iter_shard_rows(shards):
+    for path in shards:
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                yield _parse_csv_row(row)
+
+
+def write_xlsx(output, rows) -> None:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Заказы")
+    for index, width in enumerate(EXPORT_COLUMN_WIDTHS, 1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal='center', vertical='center')
+    header = []
+    for title in EXPORT_HEADERS:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    sheet.append(header)
+
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(output)
+
+
+def build_xlsx_from_shards(output, months=None) -> int:
+    shards = list_shards(months)
+    write_xlsx(output, iter_shard_rows(shards))
+    return len(shards)
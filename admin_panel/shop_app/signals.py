@@ -0,0 +1,93 @@
+import functools
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .images import optimize_image
+from .models import Category, Subcategory, Product, CatalogVersion, Mailing
+
+logger = logging.getLogger(__name__)
+
+_image_executor: ProcessPoolExecutor | None = None
+
+
+def bump_catalog_version():
+    if not CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        CatalogVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Subcategory)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Subcategory)
+@receiver(post_delete, sender=Product)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(pre_save, sender=Product)
+def reset_product_image_derivatives(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    old_image = Product.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+    if old_image != instance.image.name:
+        instance.image_optimized = None
+        instance.image_file_id = None
+
+
+@receiver(pre_save, sender=Mailing)
+def reset_mailing_photo_file_id(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    old_photo = Mailing.objects.filter(pk=instance.pk).values_list('photo', flat=True).first()
+    if old_photo != instance.photo.name:
+        instance.photo_file_id = None
+
+
+def _get_image_executor() -> ProcessPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(max_workers=settings.IMAGE_OPTIMIZER_WORKERS)
+    return _image_executor
+
+
+def _store_optimized_image(product_id: int, image_name: str, future: Future):
+    try:
+        optimized_name = future.result()
+    except Exception:
+        logger.exception("Failed to optimize image %s", image_name)
+        return
+
+    close_old_connections()
+    updated = Product.objects.filter(pk=product_id, image=image_name).update(
+        image_optimized=optimized_name,
+        image_file_id=None,
+    )
+    if updated:
+        bump_catalog_version()
+
+
+def schedule_image_optimization(product_id: int, image_name: str, image_path: str):
+    future = _get_image_executor().submit(
+        optimize_image,
+        image_path,
+        str(settings.MEDIA_ROOT),
+        settings.PRODUCT_IMAGE_MAX_SIDE,
+        settings.PRODUCT_IMAGE_QUALITY,
+    )
+    future.add_done_callback(functools.partial(_store_optimized_image, product_id, image_name))
+
+
+@receiver(post_save, sender=Product)
+def optimize_product_image(sender, instance, **kwargs):
+    if not instance.image or instance.image_optimized:
+        return
+    transaction.on_commit(functools.partial(
+        schedule_image_optimization, instance.pk, instance.image.name, instance.image.path
+    ))
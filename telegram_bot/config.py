@@ -25,13 +25,55 @@ WEB_SERVER_HOST = os.getenv("WEB_SERVER_HOST")
 WEB_SERVER_PORT = int(os.getenv("WEB_SERVER_PORT"))
 
 REQUIRED_CHAT_IDS = os.getenv("REQUIRED_CHAT_IDS").split(',')
+MEMBERSHIP_CACHE_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL", 300))
+MEMBERSHIP_NEGATIVE_CACHE_TTL = int(os.getenv("MEMBERSHIP_NEGATIVE_CACHE_TTL", 10))
+MEMBERSHIP_CACHE_SIZE = int(os.getenv("MEMBERSHIP_CACHE_SIZE", 10000))
+CHAT_INFO_REFRESH_INTERVAL = int(os.getenv("CHAT_INFO_REFRESH_INTERVAL", 600))
+CHAT_INFO_RETRY_DELAY = int(os.getenv("CHAT_INFO_RETRY_DELAY", 5))
 
 YOOKASSA_SHOP_ID = os.getenv("YOOKASSA_SHOP_ID")
 YOOKASSA_SECRET_KEY = os.getenv("YOOKASSA_SECRET_KEY")
 YOOKASSA_RETURN_URL = os.getenv("YOOKASSA_RETURN_URL", "https://t.me/")
+YOOKASSA_API_URL = os.getenv("YOOKASSA_API_URL", "https://api.yookassa.ru/v3/")
+YOOKASSA_TIMEOUT = float(os.getenv("YOOKASSA_TIMEOUT", 15))
+YOOKASSA_CONNECT_TIMEOUT = float(os.getenv("YOOKASSA_CONNECT_TIMEOUT", 5))
+YOOKASSA_POOL_SIZE = int(os.getenv("YOOKASSA_POOL_SIZE", 20))
+YOOKASSA_MAX_RETRIES = int(os.getenv("YOOKASSA_MAX_RETRIES", 3))
+YOOKASSA_RETRY_DELAY = float(os.getenv("YOOKASSA_RETRY_DELAY", 0.5))
 
 WEBHOOK_YOOKASSA_PATH = os.getenv("WEBHOOK_YOOKASSA_PATH", "/yookassa_payment_webhook")
+PAYMENT_INBOX_POLL_INTERVAL = int(os.getenv("PAYMENT_INBOX_POLL_INTERVAL", 5))
+PAYMENT_INBOX_BATCH_SIZE = int(os.getenv("PAYMENT_INBOX_BATCH_SIZE", 20))
+PAYMENT_EVENT_MAX_ATTEMPTS = int(os.getenv("PAYMENT_EVENT_MAX_ATTEMPTS", 5))
+PAYMENT_EVENT_RETRY_DELAY = int(os.getenv("PAYMENT_EVENT_RETRY_DELAY", 30))
+PAYMENT_EVENT_STALE_AFTER = int(os.getenv("PAYMENT_EVENT_STALE_AFTER", 300))
+PENDING_ORDER_TTL = int(os.getenv("PENDING_ORDER_TTL", 86400))
+PAYMENT_RECONCILE_INTERVAL = int(os.getenv("PAYMENT_RECONCILE_INTERVAL", 300))
+PAYMENT_RECONCILE_AFTER = int(os.getenv("PAYMENT_RECONCILE_AFTER", 900))
+PAYMENT_RECONCILE_MAX_AGE = min(int(os.getenv("PAYMENT_RECONCILE_MAX_AGE", 82800)), PENDING_ORDER_TTL - 1)
+PAYMENT_RECONCILE_BATCH_SIZE = int(os.getenv("PAYMENT_RECONCILE_BATCH_SIZE", 200))
+PAYMENT_RECONCILE_CONCURRENCY = int(os.getenv("PAYMENT_RECONCILE_CONCURRENCY", 5))
+PAYMENT_RECONCILE_RATE_LIMIT = float(os.getenv("PAYMENT_RECONCILE_RATE_LIMIT", 5))
+ORDER_EXPIRY_INTERVAL = int(os.getenv("ORDER_EXPIRY_INTERVAL", 600))
+ORDER_EXPIRY_BATCH_SIZE = int(os.getenv("ORDER_EXPIRY_BATCH_SIZE", 1000))
+ORDER_EXPIRY_NOTIFY_RATE = float(os.getenv("ORDER_EXPIRY_NOTIFY_RATE", 20))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_QUEUE_WAIT_WARNING = float(os.getenv("DB_QUEUE_WAIT_WARNING", 0.5))
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9100))
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 100))
+EXPORT_POLL_INTERVAL = int(os.getenv("EXPORT_POLL_INTERVAL", 30))
 
 USER_UPDATE_INTERVAL = timedelta(days=1)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 50000))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 3600))
+USER_FLUSH_INTERVAL = int(os.getenv("USER_FLUSH_INTERVAL", 10))
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", 10000))
+FSM_CACHE_TTL = float(os.getenv("FSM_CACHE_TTL", 1))
 ITEMS_PER_PAGE = 5
+PRODUCTS_RENDER_MODE = os.getenv("PRODUCTS_RENDER_MODE", "cards")
+CATALOG_POLL_INTERVAL = int(os.getenv("CATALOG_POLL_INTERVAL", 5))
 MAX_MESSAGE_TEXT_LENGTH = 4000
+MAX_CALLBACK_DATA_LENGTH = 64
@@ -2,6 +2,7 @@ from aiogram import Dispatcher
 
 from .cart import router as cart_router
 from .catalog import router as catalog_router
+from .chat_member import router as chat_member_router
 from .faq import router as faq_router
 from .start import router as start_router
 
@@ -12,4 +13,5 @@ def setup_handlers(dp: Dispatcher) -> None:
         catalog_router,
         cart_router,
         faq_router,
+        chat_member_router,
     )
@@ -4,12 +4,12 @@ from aiogram import Router, F, html
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from asgiref.sync import sync_to_async
-from django.db import transaction
 from keyboards.callback_data import BackCallback, DeleteCartCallback, OrderCallback
 from keyboards.inline_keyboards import back_to_main_menu_keyboard
-from shop_app.models import TelegramUser, Cart, Product, Order, OrderItem
+from shop_app.checkout import create_order_from_cart, attach_payment, release_checkout
+from shop_app.models import TelegramUser, Cart
 from states import OrderStates
+from utils.db import db_sync
 from utils.messages import update_or_send_message
 from utils.yookassa_api import create_yookassa_payment
 
@@ -17,7 +17,7 @@ router = Router()
 
 
 async def _get_cart_items_and_total_price(tg_user: TelegramUser):
-    cart_items = await sync_to_async(list)(
+    cart_items = await db_sync(list)(
         Cart.objects.filter(user=tg_user).select_related('product').order_by('product__name')
     )
     total_cart_price = sum(float(item.quantity) * float(item.product.price) for item in cart_items)
@@ -157,7 +157,7 @@ async def prompt_delete_cart_items(callback: CallbackQuery, state: FSMContext, t
 @router.callback_query(DeleteCartCallback.filter(F.delete_all.is_(False)))
 async def delete_cart_item(callback: CallbackQuery, state: FSMContext, callback_data: DeleteCartCallback,
                            tg_user: TelegramUser):
-    deleted_count = await sync_to_async(Cart.objects.filter(id=callback_data.cart_item_id, user=tg_user).delete)()
+    deleted_count = await db_sync(Cart.objects.filter(id=callback_data.cart_item_id, user=tg_user).delete)()
     if deleted_count[0] > 0:
         await callback.answer(texts.CART_ITEM_DELETED_MESSAGE, show_alert=True)
     await prompt_delete_cart_items(callback, state, tg_user, DeleteCartCallback(page=callback_data.page))
@@ -165,7 +165,7 @@ async def delete_cart_item(callback: CallbackQuery, state: FSMContext, callback_
 
 @router.callback_query(DeleteCartCallback.filter(F.delete_all.is_(True)))
 async def clear_full_cart(callback: CallbackQuery, state: FSMContext, tg_user: TelegramUser):
-    await sync_to_async(Cart.objects.filter(user=tg_user).delete)()
+    await db_sync(Cart.objects.filter(user=tg_user).delete)()
     await callback.answer(texts.CART_CLEARED_MESSAGE, show_alert=True)
     await show_cart(callback, state, tg_user)
 
@@ -230,52 +230,30 @@ async def confirm_and_initiate_payment(callback: CallbackQuery, callback_data: O
 
     await update_or_send_message(event=callback, text=texts.ORDER_PROCESSING_MESSAGE, reply_markup=None)
 
-    cart_items, total_cart_price = await _get_cart_items_and_total_price(tg_user)
-
-    if not cart_items:
-        await update_or_send_message(
-            event=callback,
-            text=texts.CART_EMPTY_FOR_CHECKOUT_MESSAGE,
-            reply_markup=back_to_main_menu_keyboard()
-        )
-        return
-
     try:
-        @sync_to_async
-        def create_order_in_db():
-            with transaction.atomic():
-                order_obj = Order.objects.create(
-                    user=tg_user,
-                    delivery_info=delivery_info,
-                    total_amount=total_cart_price,
-                    payment_status=Order.STATUS_PENDING
-                )
-
-                order_items_to_create = []
-                for item in cart_items:
-                    product_obj = Product.objects.get(id=item.product.id)
-                    order_items_to_create.append(OrderItem(
-                        order=order_obj,
-                        product=product_obj,
-                        quantity=item.quantity,
-                        price_at_purchase=item.product.price
-                    ))
-                OrderItem.objects.bulk_create(order_items_to_create)
-                return order_obj
-
-        order_obj = await create_order_in_db()
-
-        yookassa_payment = await create_yookassa_payment(
-            amount=float(total_cart_price),
-            description=texts.YOOKASSA_PAYMENT_DESCRIPTION.format(order_id=order_obj.id),
-            order_id=order_obj.id,
-            telegram_user_id=tg_user.id
-        )
-
-        order_obj.yookassa_payment_id = yookassa_payment.id
-        await sync_to_async(order_obj.save)()
-
-        await sync_to_async(Cart.objects.filter(user=tg_user).delete)()
+        checkout = await db_sync(create_order_from_cart)(tg_user.id, delivery_info)
+
+        if not checkout:
+            await update_or_send_message(
+                event=callback,
+                text=texts.CART_EMPTY_FOR_CHECKOUT_MESSAGE,
+                reply_markup=back_to_main_menu_keyboard()
+            )
+            return
+
+        order_obj = checkout.order
+        try:
+            yookassa_payment = await create_yookassa_payment(
+                amount=float(order_obj.total_amount),
+                description=texts.YOOKASSA_PAYMENT_DESCRIPTION.format(order_id=order_obj.id),
+                order_id=order_obj.id,
+                telegram_user_id=tg_user.id
+            )
+        except Exception:
+            await db_sync(release_checkout)(checkout)
+            raise
+
+        await db_sync(attach_payment)(checkout, yookassa_payment.id)
 
         builder = InlineKeyboardBuilder()
         builder.row(
@@ -1,12 +1,12 @@
-from typing import Union
-from typing import Union
+from typing import Sequence, Union
 
 import config
 import texts
 from aiogram import Router, F
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramAPIError
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message, FSInputFile
-from asgiref.sync import sync_to_async
+from aiogram.types import CallbackQuery, Message, FSInputFile, InputMediaPhoto
 from django.db import transaction
 from keyboards.callback_data import CategoryCallback, SubcategoryCallback, ProductCallback, BackCallback, \
     AddToCartCallback
@@ -15,8 +15,10 @@ from keyboards.inline_keyboards import get_categories_keyboard, get_subcategorie
 from keyboards.inline_keyboards import (
     main_menu_keyboard,
 )
-from shop_app.models import Category, Subcategory, Product, Cart, TelegramUser
+from shop_app.models import Product, Cart, TelegramUser
 from states import CartStates
+from utils.catalog import ProductNode, get_catalog, get_image_file_id, remember_image_file_id
+from utils.db import db_sync
 from utils.messages import update_or_send_message
 
 from .cart import show_cart
@@ -27,7 +29,7 @@ router = Router()
 @router.callback_query(CategoryCallback.filter())
 async def show_categories(callback: CallbackQuery, callback_data: CategoryCallback, state: FSMContext):
     await callback.answer()
-    categories = await sync_to_async(list)(Category.objects.all())
+    categories = get_catalog().categories
 
     keyboard = await get_categories_keyboard(categories, callback_data.page)
     message_text = texts.CATALOG_SELECT_CATEGORY if categories else texts.CATALOG_NO_CATEGORIES
@@ -38,8 +40,7 @@ async def show_categories(callback: CallbackQuery, callback_data: CategoryCallba
 @router.callback_query(SubcategoryCallback.filter())
 async def paginate_categories(callback: CallbackQuery, callback_data: SubcategoryCallback, state: FSMContext):
     await callback.answer()
-    subcategories_qs = Subcategory.objects.filter(category_id=callback_data.category_id).select_related('category')
-    subcategories = await sync_to_async(list)(subcategories_qs.all())
+    subcategories = get_catalog().get_subcategories(callback_data.category_id)
 
     keyboard = await get_subcategories_keyboard(callback_data.category_id, subcategories, callback_data.page)
     message_text = texts.CATALOG_SELECT_SUBCATEGORY if subcategories else texts.CATALOG_NO_SUBCATEGORIES
@@ -49,57 +50,97 @@ async def paginate_categories(callback: CallbackQuery, callback_data: Subcategor
 
 @router.callback_query(ProductCallback.filter())
 async def show_products(callback: CallbackQuery, callback_data: ProductCallback, state: FSMContext):
-    subcategory = await sync_to_async(Subcategory.objects.select_related('category').get)(
-        id=callback_data.subcategory_id
+    catalog = get_catalog()
+    subcategory = catalog.subcategory_by_id.get(callback_data.subcategory_id)
+    category_id_for_back = subcategory.category_id if subcategory else 0
+
+    page = catalog.get_products_page(
+        callback_data.subcategory_id,
+        callback_data.after_id,
+        callback_data.after_name,
+        config.ITEMS_PER_PAGE,
     )
-    category_id_for_back = subcategory.category.id
+    products = page[:config.ITEMS_PER_PAGE]
+    has_more = len(page) > config.ITEMS_PER_PAGE
 
-    products_qs = Product.objects.filter(
-        subcategory_id=callback_data.subcategory_id
-    ).select_related('subcategory__category')
-    products = await sync_to_async(list)(products_qs.all())
-
-    if products and callback_data.offset <= len(products):
-        await _send_products_batch(callback, products, callback_data.offset)
+    send_as_album = config.PRODUCTS_RENDER_MODE == "album" and _can_send_album(products)
+    if send_as_album:
+        await _send_products_album(callback, products)
+    elif products:
+        await _send_products_batch(callback, products)
 
     keyboard = await get_products_keyboard(
         subcategory_id=callback_data.subcategory_id,
-        products=products,
-        offset=callback_data.offset,
-        category_id_for_back=category_id_for_back
+        next_after=products[-1] if has_more else None,
+        category_id_for_back=category_id_for_back,
+        cart_products=products if send_as_album else ()
     )
 
-    if products:
-        has_more = callback_data.offset + config.ITEMS_PER_PAGE < len(products)
+    if products or callback_data.after_id:
         message_text = texts.CATALOG_SHOW_MORE_PRODUCTS if has_more else texts.CATALOG_NO_MORE_PRODUCTS
     else:
         message_text = texts.CATALOG_NO_PRODUCTS
 
-    await update_or_send_message(event=callback, text=message_text, reply_markup=keyboard)
+    if products:
+        await callback.bot.send_message(
+            chat_id=callback.from_user.id,
+            text=message_text,
+            reply_markup=keyboard,
+            parse_mode=ParseMode.HTML
+        )
+    else:
+        await update_or_send_message(event=callback, text=message_text, reply_markup=keyboard)
+
+
+def _build_product_caption(product: ProductNode) -> str:
+    return texts.PRODUCT_CARD_TEMPLATE.format(
+        name=product.name,
+        description=product.description or texts.PRODUCT_NO_DESCRIPTION,
+        price=product.price
+    )
+
+
+def _can_send_album(products: Sequence[ProductNode]) -> bool:
+    return 2 <= len(products) <= 10 and all(product.image_path for product in products)
 
 
 async def _send_products_batch(
         event: Union[CallbackQuery, Message],
-        products: list,
-        offset: int = 0
+        products: Sequence[ProductNode]
 ):
-    products_batch = products[offset:offset + config.ITEMS_PER_PAGE]
-
-    for product in products_batch:
-        caption = texts.PRODUCT_CARD_TEMPLATE.format(
-            name=product.name,
-            description=product.description or texts.PRODUCT_NO_DESCRIPTION,
-            price=product.price
+    for product in products:
+        file_id = get_image_file_id(product)
+        photo = file_id or (FSInputFile(product.image_path) if product.image_path else None)
+        keyboard = await get_products_batch_keyboard(product.id)
+        message = await update_or_send_message(
+            event=event, photo=photo, caption=_build_product_caption(product), force_new=True, reply_markup=keyboard
         )
+        if product.image_path and not file_id and message.photo:
+            await remember_image_file_id(product, message.photo[-1].file_id)
 
-        photo = FSInputFile(product.image.path) if product.image and product.image.name else None
-        keyboard = await get_products_batch_keyboard(product.id)
-        await update_or_send_message(event=event, photo=photo, caption=caption, force_new=True, reply_markup=keyboard)
+
+async def _send_products_album(callback: CallbackQuery, products: Sequence[ProductNode]):
+    await callback.answer()
+    try:
+        await callback.message.delete()
+    except TelegramAPIError:
+        pass
+
+    file_ids = [get_image_file_id(product) for product in products]
+    media = [
+        InputMediaPhoto(media=file_id or FSInputFile(product.image_path), caption=_build_product_caption(product))
+        for product, file_id in zip(products, file_ids)
+    ]
+    messages = await callback.bot.send_media_group(chat_id=callback.from_user.id, media=media)
+
+    for product, file_id, message in zip(products, file_ids, messages):
+        if not file_id and message.photo:
+            await remember_image_file_id(product, message.photo[-1].file_id)
 
 
 @router.callback_query(AddToCartCallback.filter(F.quantity.is_(None)))
 async def ask_for_quantity(callback: CallbackQuery, callback_data: AddToCartCallback, state: FSMContext):
-    product = await sync_to_async(Product.objects.get)(id=callback_data.product_id)
+    product = await db_sync(Product.objects.get)(id=callback_data.product_id)
 
     await state.update_data(product_id=product.id)
     await state.set_state(CartStates.waiting_for_quantity)
@@ -124,7 +165,7 @@ async def process_quantity(message: Message, state: FSMContext):
     data = await state.get_data()
     product_id = data.get('product_id')
 
-    product = await sync_to_async(Product.objects.select_related('subcategory__category').get)(id=product_id)
+    product = await db_sync(Product.objects.select_related('subcategory__category').get)(id=product_id)
     category_id_for_back = product.subcategory.category.id
 
     total_price = quantity * product.price
@@ -139,7 +180,7 @@ async def process_quantity(message: Message, state: FSMContext):
     )
 
 
-@sync_to_async
+@db_sync
 def _perform_atomic_cart_update(tg_user, product_id, quantity):
     with transaction.atomic():
         product_obj = Product.objects.get(id=product_id)
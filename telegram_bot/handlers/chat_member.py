@@ -0,0 +1,18 @@
+from aiogram import Router, F
+from aiogram.enums import ChatMemberStatus, ChatType
+from aiogram.types import ChatMemberUpdated
+from utils.subscriptions import invalidate_membership
+from utils.user_cache import user_cache
+
+router = Router()
+
+
+@router.chat_member()
+async def handle_chat_member_update(event: ChatMemberUpdated):
+    invalidate_membership(event.new_chat_member.user.id)
+
+
+@router.my_chat_member(F.chat.type == ChatType.PRIVATE)
+async def handle_bot_membership_update(event: ChatMemberUpdated):
+    is_reachable = event.new_chat_member.status not in (ChatMemberStatus.KICKED, ChatMemberStatus.LEFT)
+    await user_cache.set_reachable(event.from_user.id, is_reachable)
@@ -3,10 +3,10 @@ from aiogram import Router, F
 from aiogram.types import InlineQuery, InputTextMessageContent, InlineQueryResultArticle, CallbackQuery, \
     InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from asgiref.sync import sync_to_async
 from django.db.models import Q
 from keyboards.callback_data import BackCallback
 from shop_app.models import FAQ
+from utils.db import db_sync
 from utils.messages import update_or_send_message
 
 router = Router()
@@ -43,7 +43,7 @@ async def inline_faq_search(inline_query: InlineQuery):
         await inline_query.answer(results, is_personal=True, cache_time=0)
         return
 
-    @sync_to_async
+    @db_sync
     def get_faq_results(search_query: str):
         qs = FAQ.objects.filter(is_active=True).filter(
             Q(question__icontains=search_query) | Q(keywords__icontains=search_query)
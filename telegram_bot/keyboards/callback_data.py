@@ -12,7 +12,8 @@ class SubcategoryCallback(CallbackData, prefix="subcat"):
 
 class ProductCallback(CallbackData, prefix="prod"):
     subcategory_id: int
-    offset: int = 0
+    after_id: int = 0
+    after_name: str = ""
 
 
 class BackCallback(CallbackData, prefix='back'):
@@ -1,24 +1,23 @@
+from typing import Sequence
+
 import config
 import texts
-from aiogram import Bot
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from utils.catalog import ProductNode, product_sort_key
+from utils.subscriptions import get_chat_info
 
 from .callback_data import CategoryCallback, SubcategoryCallback, ProductCallback, BackCallback, AddToCartCallback
 
 
-async def get_subscription_keyboard(bot: Bot, chat_ids_to_display: list[str]) -> InlineKeyboardMarkup:
+async def get_subscription_keyboard(chat_ids_to_display: list[str]) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for chat_id in chat_ids_to_display:
-        try:
-            chat = await bot.get_chat(chat_id)
-            if chat.title and chat.invite_link:
-                builder.row(InlineKeyboardButton(
-                    text=texts.SUBSCRIPTION_CHAT_BUTTON_TEXT.format(chat_title=chat.title),
-                    url=chat.invite_link)
-                )
-        except Exception as e:
-            print("error ", e)
+        if chat_info := get_chat_info(chat_id):
+            builder.row(InlineKeyboardButton(
+                text=texts.SUBSCRIPTION_CHAT_BUTTON_TEXT.format(chat_title=chat_info.title),
+                url=chat_info.invite_link)
+            )
     builder.row(
         InlineKeyboardButton(text=texts.SUBSCRIPTION_CHECK_BUTTON, callback_data=BackCallback(to="main_menu").pack()))
     return builder.as_markup()
@@ -98,23 +97,33 @@ async def get_subcategories_keyboard(category_id: int, subcategories: list, page
     return builder.as_markup()
 
 
+def _pack_products_cursor(subcategory_id: int, product: ProductNode) -> str:
+    sort_name, _ = product_sort_key(product.name, product.id)
+    budget = config.MAX_CALLBACK_DATA_LENGTH - len(
+        ProductCallback(subcategory_id=subcategory_id, after_id=product.id).pack().encode()
+    )
+    after_name = sort_name.split(':', 1)[0].encode()[:budget].decode(errors='ignore')
+    return ProductCallback(subcategory_id=subcategory_id, after_id=product.id, after_name=after_name).pack()
+
+
 async def get_products_keyboard(
         subcategory_id: int,
-        products: list,
-        offset: int = 0,
-        category_id_for_back: int = 0
+        next_after: ProductNode | None = None,
+        category_id_for_back: int = 0,
+        cart_products: Sequence = ()
 ) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
-    has_more = offset + config.ITEMS_PER_PAGE < len(products)
+    for product in cart_products:
+        builder.row(InlineKeyboardButton(
+            text=texts.ADD_TO_CART_PRODUCT_BUTTON.format(product_name=product.name),
+            callback_data=AddToCartCallback(product_id=product.id).pack()
+        ))
 
-    if has_more:
+    if next_after is not None:
         builder.row(InlineKeyboardButton(
             text=texts.SHOW_MORE_BUTTON,
-            callback_data=ProductCallback(
-                subcategory_id=subcategory_id,
-                offset=offset + config.ITEMS_PER_PAGE
-            ).pack()
+            callback_data=_pack_products_cursor(subcategory_id, next_after)
         ))
 
     builder.row(InlineKeyboardButton(
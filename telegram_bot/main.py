@@ -4,35 +4,64 @@ import sys
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiohttp import web
+from django.db import DatabaseError
 
 import config
 from filters import setup_filters
 from handlers import setup_handlers
 from middlewares import setup_middlewares
-from utils.api_handlers import yookassa_webhook_handler, set_bot_instance
-from utils.yookassa_api import setup_yookassa_configuration
+from utils.api_handlers import yookassa_webhook_handler
+from utils.background import start_background_task, cancel_background_tasks
+from utils.catalog import refresh_catalog, run_catalog_watcher
+from utils.fsm_storage import DjangoStorage
+from utils.metrics import start_metrics_server, stop_metrics_server
+from utils.order_expiry import run_order_expiry_sweeper
+from utils.order_export import run_order_exporter, flush_order_exports
+from utils.payment_inbox import run_payment_inbox_consumer
+from utils.payment_reconciler import run_payment_reconciler
+from utils.subscriptions import refresh_chat_info, run_chat_info_refresher
+from utils.user_cache import user_cache, run_user_flusher
+from utils.yookassa_api import yookassa_client
 
 
-async def on_startup(bot: Bot) -> None:
+async def on_startup(bot: Bot, dispatcher: Dispatcher) -> None:
     await bot.set_webhook(
         config.WEBHOOK_URL,
         secret_token=config.WEBHOOK_SECRET,
+        allowed_updates=dispatcher.resolve_used_update_types(),
     )
-    setup_yookassa_configuration()
-    set_bot_instance(bot)
+    await yookassa_client.start()
+    if config.METRICS_PORT:
+        await start_metrics_server(config.METRICS_HOST, config.METRICS_PORT, config.METRICS_PATH)
+    await refresh_chat_info(bot)
+    try:
+        await refresh_catalog()
+    except DatabaseError:
+        logging.exception("Failed to load catalog snapshot on startup, the watcher will retry")
+    start_background_task(run_chat_info_refresher(bot))
+    start_background_task(run_user_flusher())
+    start_background_task(run_catalog_watcher())
+    start_background_task(run_order_exporter())
+    start_background_task(run_payment_inbox_consumer(bot))
+    start_background_task(run_payment_reconciler(bot))
+    start_background_task(run_order_expiry_sweeper(bot))
 
 
 async def on_shutdown(bot: Bot) -> None:
+    await cancel_background_tasks()
+    await user_cache.flush()
+    await flush_order_exports()
+    await yookassa_client.close()
+    await stop_metrics_server()
     await bot.delete_webhook()
     if bot.session:
         await bot.session.close()
 
 
 def main() -> None:
-    dp = Dispatcher(storage=MemoryStorage())
+    dp = Dispatcher(storage=DjangoStorage())
     setup_filters(dp)
     setup_middlewares(dp)
     setup_handlers(dp)
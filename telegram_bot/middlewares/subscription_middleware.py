@@ -1,11 +1,10 @@
 from typing import Callable, Dict, Any, Awaitable
 
-import config
 import texts
 from aiogram import BaseMiddleware, Bot
-from aiogram.enums import ChatMemberStatus
 from aiogram.types import Message, CallbackQuery
 from keyboards.inline_keyboards import get_subscription_keyboard
+from utils.subscriptions import get_unsubscribed_chat_ids
 
 
 class SubscriptionCheckMiddleware(BaseMiddleware):
@@ -18,11 +17,7 @@ class SubscriptionCheckMiddleware(BaseMiddleware):
         tg_id = event.from_user.id
         bot: Bot = data['bot']
 
-        unsubscribed_chat_ids = []
-        for chat_id in config.REQUIRED_CHAT_IDS:
-            member = await event.bot.get_chat_member(chat_id, tg_id)
-            if member.status == ChatMemberStatus.LEFT:
-                unsubscribed_chat_ids.append(chat_id)
+        unsubscribed_chat_ids = await get_unsubscribed_chat_ids(bot, tg_id)
 
         if unsubscribed_chat_ids:
             if isinstance(event, Message):
@@ -32,6 +27,6 @@ class SubscriptionCheckMiddleware(BaseMiddleware):
                 await event.answer()
             return await message.answer(
                 texts.SUBSCRIPTION_REQUIRED_MESSAGE,
-                reply_markup=await get_subscription_keyboard(bot, unsubscribed_chat_ids)
+                reply_markup=await get_subscription_keyboard(unsubscribed_chat_ids)
             )
         return await handler(event, data)
@@ -4,9 +4,8 @@ from typing import Callable, Dict, Any, Awaitable
 import config
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
-from asgiref.sync import sync_to_async
 from django.utils import timezone
-from shop_app.models import TelegramUser
+from utils.user_cache import user_cache
 
 
 class UserExistenceMiddleware(BaseMiddleware):
@@ -21,8 +20,8 @@ class UserExistenceMiddleware(BaseMiddleware):
         last_name = event.from_user.last_name
         username = event.from_user.username
 
-        user, created = await sync_to_async(TelegramUser.objects.get_or_create)(
-            id=tg_id,
+        user = await user_cache.get_or_create(
+            tg_id,
             defaults={
                 'first_name': first_name,
                 'last_name': last_name,
@@ -31,11 +30,19 @@ class UserExistenceMiddleware(BaseMiddleware):
         )
 
         current_time = datetime.now(tz=timezone.get_current_timezone())
-        if not created and current_time - user.updated_at > config.USER_UPDATE_INTERVAL:
+        needs_update = False
+        if current_time - user.updated_at > config.USER_UPDATE_INTERVAL:
             user.first_name = first_name
             user.last_name = last_name
             user.username = username
-            await sync_to_async(user.save)()
+            user.updated_at = current_time
+            needs_update = True
+        if not user.is_reachable:
+            user.is_reachable = True
+            user.unreachable_since = None
+            needs_update = True
+        if needs_update:
+            user_cache.schedule_update(user)
 
         data['tg_user'] = user
 
@@ -0,0 +1,113 @@
+import asyncio
+import os
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SECRET_KEY', 'test')
+os.environ.setdefault('DJANGO_ALLOWED_HOSTS', 'localhost')
+os.environ.setdefault('WEB_SERVER_PORT', '8080')
+os.environ.setdefault('REQUIRED_CHAT_IDS', '-100')
+
+import config
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase
+from yookassa.domain.request import PaymentRequest
+
+from utils.yookassa_api import YooKassaClient, YooKassaError
+
+PAYMENT = {
+    'id': '2d8c1e5e-000f-5000-8000-1b1a2f3e4d5c',
+    'status': 'pending',
+    'paid': False,
+    'amount': {'value': '100.00', 'currency': 'RUB'},
+    'created_at': '2026-10-18T12:00:00.000Z',
+    'test': True,
+    'refundable': False,
+    'metadata': {'order_id': '1'},
+}
+
+
+class YooKassaClientTest(AioHTTPTestCase):
+    async def get_application(self):
+        self.responses = []
+        self.requests = []
+
+        async def handler(request):
+            self.requests.append(request.headers.get('Idempotence-Key'))
+            status, body, delay = self.responses.pop(0) if self.responses else (200, PAYMENT, 0)
+            if delay:
+                await asyncio.sleep(delay)
+            return web.json_response(body, status=status)
+
+        app = web.Application()
+        app.router.add_post('/v3/payments', handler)
+        app.router.add_get('/v3/payments/{payment_id}', handler)
+        return app
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        patcher = mock.patch.multiple(
+            config,
+            YOOKASSA_API_URL=str(self.server.make_url('/v3/')),
+            YOOKASSA_RETRY_DELAY=0,
+            YOOKASSA_MAX_RETRIES=3,
+            YOOKASSA_TIMEOUT=0.5,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.yookassa = YooKassaClient()
+
+    async def asyncTearDown(self):
+        await self.yookassa.close()
+        await super().asyncTearDown()
+
+    def _payment_request(self) -> PaymentRequest:
+        return PaymentRequest({
+            'amount': {'value': '100.00', 'currency': 'RUB'},
+            'confirmation': {'type': 'redirect', 'return_url': 'https://t.me/'},
+            'capture': True,
+            'description': 'test',
+        })
+
+    async def test_retries_retryable_statuses_with_the_same_idempotence_key(self):
+        self.responses = [
+            (202, {}, 0),
+            (429, {'description': 'Too many requests'}, 0),
+            (503, {}, 0),
+        ]
+
+        payment = await self.yookassa.create_payment(self._payment_request(), idempotence_key='key-1')
+
+        self.assertEqual(payment.id, PAYMENT['id'])
+        self.assertEqual(self.requests, ['key-1'] * 4)
+
+    async def test_retries_timeouts(self):
+        self.responses = [(200, PAYMENT, 1)]
+
+        payment = await self.yookassa.get_payment(PAYMENT['id'])
+
+        self.assertEqual(payment.status, 'pending')
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_gives_up_after_max_retries(self):
+        self.responses = [(500, {}, 0)] * 4
+
+        with self.assertRaises(YooKassaError) as error:
+            await self.yookassa.create_payment(self._payment_request(), idempotence_key='key-2')
+
+        self.assertEqual(error.exception.status, 500)
+        self.assertEqual(self.requests, ['key-2'] * 4)
+
+    async def test_does_not_retry_client_errors(self):
+        self.responses = [(400, {'type': 'error', 'description': 'Invalid amount'}, 0)]
+
+        with self.assertRaises(YooKassaError) as error:
+            await self.yookassa.create_payment(self._payment_request(), idempotence_key='key-3')
+
+        self.assertEqual(error.exception.status, 400)
+        self.assertEqual(str(error.exception), 'Invalid amount')
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_get_payment_sends_no_idempotence_key(self):
+        await self.yookassa.get_payment(PAYMENT['id'])
+
+        self.assertEqual(self.requests, [None])
@@ -18,6 +18,7 @@ CATALOG_SHOW_MORE_PRODUCTS = "⬇️ Показать еще товары? ⬇
 CATALOG_NO_MORE_PRODUCTS = "Это все товары в данной подкатегории"
 CATALOG_NO_PRODUCTS = "В этой подкатегории пока нет товаров."
 ADD_TO_CART_BUTTON = "🛒 Добавить в корзину"
+ADD_TO_CART_PRODUCT_BUTTON = "🛒 {product_name}"
 
 PRODUCT_CARD_TEMPLATE = "<b>{name}</b>\n<i>{description}</i>\nЦена: <b>{price}₽</b>"
 PRODUCT_NO_DESCRIPTION = "Нет описания"
@@ -99,6 +100,10 @@ ORDER_CANCELED_NOTIFICATION = (
     "❌ Оплата вашего заказа №{order_id} была отменена. "
     "Если это ошибка, попробуйте оформить заказ снова или свяжитесь с нами."
 )
+ORDER_EXPIRED_NOTIFICATION = (
+    "⌛ Заказ №{order_id} не был оплачен вовремя и отменен. "
+    "Если вы все еще хотите сделать покупку, оформите заказ заново."
+)
 
 FAQ_INLINE_QUERY_PROMPT = "Введите ваш вопрос для поиска в FAQ..."
 FAQ_NO_RESULTS = "По вашему запросу ничего не найдено."
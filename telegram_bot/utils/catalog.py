@@ -0,0 +1,192 @@
+import asyncio
+import bisect
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Mapping
+
+import config
+from django.db import DatabaseError
+from shop_app.models import Category, Subcategory, Product, CatalogVersion
+
+from .db import db_sync
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProductNode:
+    id: int
+    subcategory_id: int
+    name: str
+    description: str | None
+    price: Decimal
+    image_name: str | None
+    optimized_image_name: str | None
+    image_path: str | None
+    image_file_id: str | None
+
+
+@dataclass(frozen=True)
+class SubcategoryNode:
+    id: int
+    category_id: int
+    name: str
+    products: tuple[ProductNode, ...] = ()
+    product_keys: tuple[tuple[str, int], ...] = ()
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    id: int
+    name: str
+    subcategories: tuple[SubcategoryNode, ...] = ()
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    categories: tuple[CategoryNode, ...] = ()
+    category_by_id: Mapping[int, CategoryNode] = field(default_factory=lambda: MappingProxyType({}))
+    subcategory_by_id: Mapping[int, SubcategoryNode] = field(default_factory=lambda: MappingProxyType({}))
+    product_by_id: Mapping[int, ProductNode] = field(default_factory=lambda: MappingProxyType({}))
+    product_positions: Mapping[int, int] = field(default_factory=lambda: MappingProxyType({}))
+
+    def get_subcategories(self, category_id: int) -> tuple[SubcategoryNode, ...]:
+        category = self.category_by_id.get(category_id)
+        return category.subcategories if category else ()
+
+    def get_products(self, subcategory_id: int) -> tuple[ProductNode, ...]:
+        subcategory = self.subcategory_by_id.get(subcategory_id)
+        return subcategory.products if subcategory else ()
+
+    def get_products_page(self, subcategory_id: int, after_id: int, after_name: str,
+                          limit: int) -> tuple[ProductNode, ...]:
+        subcategory = self.subcategory_by_id.get(subcategory_id)
+        if subcategory is None:
+            return ()
+
+        start = 0
+        if after_id:
+            product = self.product_by_id.get(after_id)
+            if product is not None and product.subcategory_id == subcategory_id:
+                start = self.product_positions[after_id] + 1
+            else:
+                start = bisect.bisect_right(subcategory.product_keys, (after_name, after_id))
+        return subcategory.products[start:start + limit + 1]
+
+
+def product_sort_key(name: str, product_id: int) -> tuple[str, int]:
+    return name.casefold(), product_id
+
+
+_snapshot = CatalogSnapshot(version=-1)
+_image_file_ids: dict[str, str] = {}
+
+
+def get_catalog() -> CatalogSnapshot:
+    return _snapshot
+
+
+def get_image_file_id(product: ProductNode) -> str | None:
+    return _image_file_ids.get(product.image_path) or product.image_file_id
+
+
+@db_sync
+def _save_image_file_id(product: ProductNode, file_id: str) -> None:
+    Product.objects.filter(
+        id=product.id,
+        image=product.image_name,
+        image_optimized=product.optimized_image_name,
+    ).update(image_file_id=file_id)
+
+
+async def remember_image_file_id(product: ProductNode, file_id: str) -> None:
+    _image_file_ids[product.image_path] = file_id
+    await _save_image_file_id(product, file_id)
+
+
+def _get_image_path(product: Product) -> str | None:
+    if product.image_optimized:
+        return product.image_optimized.path
+    if product.image:
+        return product.image.path
+    return None
+
+
+@db_sync
+def _get_catalog_version() -> int:
+    return CatalogVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+@db_sync
+def _build_catalog(version: int) -> CatalogSnapshot:
+    products_by_subcategory: dict[int, list[ProductNode]] = {}
+    for product in Product.objects.all():
+        products_by_subcategory.setdefault(product.subcategory_id, []).append(ProductNode(
+            id=product.id,
+            subcategory_id=product.subcategory_id,
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            image_name=product.image.name,
+            optimized_image_name=product.image_optimized.name,
+            image_path=_get_image_path(product),
+            image_file_id=product.image_file_id,
+        ))
+    for products in products_by_subcategory.values():
+        products.sort(key=lambda product: product_sort_key(product.name, product.id))
+
+    subcategories_by_category: dict[int, list[SubcategoryNode]] = {}
+    for subcategory in Subcategory.objects.order_by('order', 'name', 'id'):
+        products = tuple(products_by_subcategory.get(subcategory.id, ()))
+        subcategories_by_category.setdefault(subcategory.category_id, []).append(SubcategoryNode(
+            id=subcategory.id,
+            category_id=subcategory.category_id,
+            name=subcategory.name,
+            products=products,
+            product_keys=tuple(product_sort_key(product.name, product.id) for product in products),
+        ))
+
+    categories = tuple(
+        CategoryNode(
+            id=category.id,
+            name=category.name,
+            subcategories=tuple(subcategories_by_category.get(category.id, ())),
+        )
+        for category in Category.objects.order_by('order', 'name', 'id')
+    )
+    subcategories = [subcategory for category in categories for subcategory in category.subcategories]
+
+    return CatalogSnapshot(
+        version=version,
+        categories=categories,
+        category_by_id=MappingProxyType({category.id: category for category in categories}),
+        subcategory_by_id=MappingProxyType({subcategory.id: subcategory for subcategory in subcategories}),
+        product_by_id=MappingProxyType({
+            product.id: product for subcategory in subcategories for product in subcategory.products
+        }),
+        product_positions=MappingProxyType({
+            product.id: position
+            for subcategory in subcategories
+            for position, product in enumerate(subcategory.products)
+        }),
+    )
+
+
+async def refresh_catalog() -> None:
+    global _snapshot
+    version = await _get_catalog_version()
+    if version != _snapshot.version:
+        _snapshot = await _build_catalog(version)
+        logger.info("Catalog snapshot rebuilt at version %s", version)
+
+
+async def run_catalog_watcher() -> None:
+    while True:
+        await asyncio.sleep(config.CATALOG_POLL_INTERVAL)
+        try:
+            await refresh_catalog()
+        except DatabaseError:
+            logger.exception("Failed to refresh catalog snapshot")
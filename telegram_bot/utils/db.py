@@ -0,0 +1,56 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+import config
+from django.db import connections
+
+from .metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=config.DB_POOL_SIZE, thread_name_prefix="db")
+
+db_queue_wait = histogram("db_queue_wait_seconds", "Time DB calls wait for a free executor thread.")
+db_call_duration = histogram("db_call_duration_seconds", "Time DB calls run on an executor thread.")
+
+
+def _recycle_connections() -> None:
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is None:
+            continue
+        if connection.get_autocommit() != connection.settings_dict["AUTOCOMMIT"]:
+            connection.close()
+        elif connection.errors_occurred:
+            if connection.is_usable():
+                connection.errors_occurred = False
+            else:
+                connection.close()
+        elif connection.close_at is not None and time.monotonic() >= connection.close_at:
+            connection.close()
+
+
+def db_sync(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        submitted_at = time.monotonic()
+
+        def run():
+            started_at = time.monotonic()
+            queue_wait = started_at - submitted_at
+            db_queue_wait.observe(queue_wait)
+            if queue_wait > config.DB_QUEUE_WAIT_WARNING:
+                logger.warning("DB call %s waited %.3fs for an executor thread", func.__qualname__, queue_wait)
+
+            _recycle_connections()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                db_call_duration.observe(time.monotonic() - started_at)
+
+        return await asyncio.get_running_loop().run_in_executor(_executor, run)
+
+    return wrapper
@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional
+
+import config
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from django.utils import timezone
+from shop_app.models import FSMRecord
+from utils.cache import TTLCache
+from utils.db import db_sync
+
+
+@db_sync
+def _load_record(key: str) -> tuple[Optional[str], Dict[str, Any]]:
+    return FSMRecord.objects.filter(key=key).values_list('state', 'data').first() or (None, {})
+
+
+@db_sync
+def _save_field(key: str, field: str, value: Any) -> None:
+    if value:
+        FSMRecord.objects.bulk_create(
+            [FSMRecord(key=key, **{field: value})],
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=[field, 'updated_at'],
+        )
+        return
+
+    FSMRecord.objects.filter(key=key).update(**{field: value, 'updated_at': timezone.now()})
+    FSMRecord.objects.filter(key=key, state__isnull=True, data={}).delete()
+
+
+class DjangoStorage(BaseStorage):
+    def __init__(self, key_builder: KeyBuilder | None = None):
+        self.key_builder = key_builder or DefaultKeyBuilder(
+            with_bot_id=True,
+            with_business_connection_id=True,
+            with_destiny=True,
+        )
+        self._cache = TTLCache(maxsize=config.FSM_CACHE_SIZE, ttl=config.FSM_CACHE_TTL)
+
+    async def _get_record(self, key: str) -> tuple[Optional[str], Dict[str, Any]]:
+        record = self._cache.get(key)
+        if record is None:
+            record = await _load_record(key)
+            self._cache.set(key, record)
+        return record
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record_key = self.key_builder.build(key)
+        state = state.state if isinstance(state, State) else state
+        await _save_field(record_key, 'state', state)
+
+        record = self._cache.get(record_key)
+        if record is None:
+            self._cache.pop(record_key)
+        else:
+            self._cache.set(record_key, (state, record[1]))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._get_record(self.key_builder.build(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, got {type(data).__name__}")
+
+        record_key = self.key_builder.build(key)
+        data = data.copy()
+        await _save_field(record_key, 'data', data)
+
+        record = self._cache.get(record_key)
+        if record is None:
+            self._cache.pop(record_key)
+        else:
+            self._cache.set(record_key, (record[0], data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._get_record(self.key_builder.build(key))
+        return data.copy()
+
+    async def close(self) -> None:
+        self._cache.clear()
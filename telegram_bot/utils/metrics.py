@@ -0,0 +1,69 @@
+import bisect
+import threading
+
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list["Histogram"] = []
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self._counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self._count}')
+        lines.append(f"{self.name}_sum {self._sum}")
+        lines.append(f"{self.name}_count {self._count}")
+        return "\n".join(lines)
+
+
+def histogram(name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, documentation, buckets)
+    _registry.append(metric)
+    return metric
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    body = "\n".join(metric.render() for metric in _registry) + "\n"
+    return web.Response(text=body, content_type="text/plain")
+
+
+_metrics_runner: web.AppRunner | None = None
+
+
+async def start_metrics_server(host: str, port: int, path: str) -> None:
+    global _metrics_runner
+    app = web.Application()
+    app.router.add_get(path, metrics_handler)
+    _metrics_runner = web.AppRunner(app)
+    await _metrics_runner.setup()
+    await web.TCPSite(_metrics_runner, host, port).start()
+
+
+async def stop_metrics_server() -> None:
+    global _metrics_runner
+    if _metrics_runner:
+        await _metrics_runner.cleanup()
+        _metrics_runner = None
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+import config
+import texts
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from shop_app.models import Order
+from shop_app.ratelimit import TokenBucket
+from utils.db import db_sync
+from utils.payment_inbox import apply_payment_status
+from utils.payment_reconciler import PAYMENT_STATUS_TRANSITIONS, mark_orders_reconciled
+from utils.yookassa_api import yookassa_client, YooKassaError
+
+logger = logging.getLogger(__name__)
+
+
+@db_sync
+def expire_pending_orders() -> list[tuple[int, int]]:
+    table = connection.ops.quote_name(Order._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} SET payment_status = %s
+            WHERE payment_status = %s AND id IN (
+                SELECT id FROM {table}
+                WHERE payment_status = %s AND yookassa_payment_id IS NULL AND created_at < %s
+                ORDER BY created_at
+                LIMIT %s
+            )
+            RETURNING id, user_id
+            """,
+            [
+                Order.STATUS_CANCELED,
+                Order.STATUS_PENDING,
+                Order.STATUS_PENDING,
+                timezone.now() - timedelta(seconds=config.PENDING_ORDER_TTL),
+                config.ORDER_EXPIRY_BATCH_SIZE,
+            ],
+        )
+        return cursor.fetchall()
+
+
+@db_sync
+def _get_expired_payment_orders() -> list[tuple[int, str, int]]:
+    return list(Order.objects.filter(
+        payment_status=Order.STATUS_PENDING,
+        created_at__lt=timezone.now() - timedelta(seconds=config.PENDING_ORDER_TTL),
+        yookassa_payment_id__isnull=False,
+    ).order_by(
+        F('reconciled_at').asc(nulls_first=True), 'created_at',
+    ).values_list('id', 'yookassa_payment_id', 'user_id')[:config.PAYMENT_RECONCILE_BATCH_SIZE])
+
+
+@db_sync
+def _cancel_pending_order(order_id: int) -> bool:
+    return Order.objects.filter(
+        id=order_id,
+        payment_status=Order.STATUS_PENDING,
+    ).update(payment_status=Order.STATUS_CANCELED) == 1
+
+
+async def _expire_payment_order(bot: Bot, limiter: TokenBucket, semaphore: asyncio.Semaphore,
+                                order_id: int, payment_id: str, user_id: int) -> bool:
+    async with semaphore:
+        await limiter.acquire()
+        try:
+            payment = await yookassa_client.get_payment(payment_id)
+        except YooKassaError as e:
+            logger.warning("Failed to fetch payment %s for expired order %s: %s", payment_id, order_id, e)
+            return False
+
+    status = PAYMENT_STATUS_TRANSITIONS.get(payment.status)
+    if status:
+        await apply_payment_status(bot, order_id, payment_id, user_id, status)
+        return False
+    return await _cancel_pending_order(order_id)
+
+
+async def expire_payment_orders(bot: Bot) -> list[tuple[int, int]]:
+    orders = await _get_expired_payment_orders()
+    if not orders:
+        return []
+
+    limiter = TokenBucket(config.PAYMENT_RECONCILE_RATE_LIMIT)
+    semaphore = asyncio.Semaphore(config.PAYMENT_RECONCILE_CONCURRENCY)
+    results = await asyncio.gather(*(
+        _expire_payment_order(bot, limiter, semaphore, order_id, payment_id, user_id)
+        for order_id, payment_id, user_id in orders
+    ))
+    await mark_orders_reconciled([order_id for order_id, _, _ in orders])
+    return [(order_id, user_id) for (order_id, _, user_id), expired in zip(orders, results) if expired]
+
+
+async def _notify_user(bot: Bot, limiter: TokenBucket, order_id: int, user_id: int) -> None:
+    while True:
+        await limiter.acquire()
+        try:
+            await bot.send_message(chat_id=user_id, text=texts.ORDER_EXPIRED_NOTIFICATION.format(order_id=order_id))
+            return
+        except TelegramRetryAfter as e:
+            limiter.pause(e.retry_after)
+        except TelegramAPIError:
+            return
+
+
+async def sweep_expired_orders(bot: Bot) -> int:
+    limiter = TokenBucket(config.ORDER_EXPIRY_NOTIFY_RATE)
+    expired_count = 0
+    while True:
+        expired = await expire_pending_orders()
+        expired_count += len(expired)
+        for order_id, user_id in expired:
+            await _notify_user(bot, limiter, order_id, user_id)
+        if len(expired) < config.ORDER_EXPIRY_BATCH_SIZE:
+            break
+
+    expired = await expire_payment_orders(bot)
+    expired_count += len(expired)
+    for order_id, user_id in expired:
+        await _notify_user(bot, limiter, order_id, user_id)
+
+    if expired_count:
+        logger.info("Canceled %s expired pending orders", expired_count)
+    return expired_count
+
+
+async def run_order_expiry_sweeper(bot: Bot) -> None:
+    while True:
+        try:
+            await sweep_expired_orders(bot)
+        except Exception:
+            logger.exception("Pending order expiry sweep failed")
+        await asyncio.sleep(config.ORDER_EXPIRY_INTERVAL)
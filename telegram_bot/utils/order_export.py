@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+import config
+from django.db import transaction
+from django.utils import timezone
+from shop_app.models import Order
+from shop_app.order_export import append_orders
+from utils.db import db_sync
+
+logger = logging.getLogger(__name__)
+
+_export_wakeup = asyncio.Event()
+
+
+def notify_order_exporter() -> None:
+    _export_wakeup.set()
+
+
+@db_sync
+def _export_pending_orders() -> int:
+    with transaction.atomic():
+        orders = list(Order.objects.select_for_update(skip_locked=True).filter(
+            payment_status=Order.STATUS_PAID,
+            exported_at__isnull=True,
+        ).order_by('paid_at', 'id')[:config.EXPORT_BATCH_SIZE])
+        if orders:
+            append_orders(orders)
+            Order.objects.filter(id__in=[order.id for order in orders]).update(exported_at=timezone.now())
+        return len(orders)
+
+
+async def export_pending_orders() -> None:
+    while await _export_pending_orders() == config.EXPORT_BATCH_SIZE:
+        pass
+
+
+async def run_order_exporter() -> None:
+    while True:
+        _export_wakeup.clear()
+        try:
+            await export_pending_orders()
+        except Exception:
+            logger.exception("Failed to export paid orders")
+
+        try:
+            await asyncio.wait_for(_export_wakeup.wait(), timeout=config.EXPORT_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def flush_order_exports() -> None:
+    try:
+        await export_pending_orders()
+    except Exception:
+        logger.exception("Failed to export paid orders on shutdown")
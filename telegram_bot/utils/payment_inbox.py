@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+import config
+import texts
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from shop_app.models import Order, PaymentEvent
+from utils.db import db_sync
+from utils.order_export import notify_order_exporter
+from yookassa.domain.notification import WebhookNotificationFactory, WebhookNotificationEventType
+
+logger = logging.getLogger(__name__)
+
+EVENT_TRANSITIONS = {
+    WebhookNotificationEventType.PAYMENT_SUCCEEDED: Order.STATUS_PAID,
+    WebhookNotificationEventType.PAYMENT_CANCELED: Order.STATUS_CANCELED,
+}
+STATUS_NOTIFICATIONS = {
+    Order.STATUS_PAID: texts.ORDER_PAID_NOTIFICATION,
+    Order.STATUS_CANCELED: texts.ORDER_CANCELED_NOTIFICATION,
+}
+
+_inbox_wakeup = asyncio.Event()
+
+
+@db_sync
+def store_payment_event(payment_id: str, event: str, payload: dict) -> None:
+    PaymentEvent.objects.bulk_create(
+        [PaymentEvent(payment_id=payment_id, event=event, payload=payload)],
+        ignore_conflicts=True,
+    )
+
+
+def notify_payment_inbox() -> None:
+    _inbox_wakeup.set()
+
+
+@db_sync
+def _claim_payment_events() -> list[PaymentEvent]:
+    with transaction.atomic():
+        events = list(PaymentEvent.objects.select_for_update(skip_locked=True).filter(
+            status=PaymentEvent.STATUS_PENDING,
+            run_after__lte=timezone.now(),
+        ).order_by('id')[:config.PAYMENT_INBOX_BATCH_SIZE])
+        if events:
+            PaymentEvent.objects.filter(id__in=[event.id for event in events]).update(
+                status=PaymentEvent.STATUS_PROCESSING,
+                locked_at=timezone.now(),
+                attempts=F('attempts') + 1,
+            )
+        return events
+
+
+@db_sync
+def _requeue_stale_events() -> int:
+    return PaymentEvent.objects.filter(
+        status=PaymentEvent.STATUS_PROCESSING,
+        locked_at__lt=timezone.now() - timedelta(seconds=config.PAYMENT_EVENT_STALE_AFTER),
+    ).update(status=PaymentEvent.STATUS_PENDING, locked_at=None)
+
+
+@db_sync
+def _complete_event(event: PaymentEvent, outcome: str, order_id: int | None = None) -> None:
+    PaymentEvent.objects.filter(id=event.id).update(
+        status=PaymentEvent.STATUS_PROCESSED,
+        outcome=outcome,
+        order_id=order_id,
+        locked_at=None,
+        processed_at=timezone.now(),
+    )
+
+
+@db_sync
+def _fail_event(event: PaymentEvent, error: str) -> None:
+    attempts = event.attempts + 1
+    if attempts < config.PAYMENT_EVENT_MAX_ATTEMPTS:
+        status = PaymentEvent.STATUS_PENDING
+        run_after = timezone.now() + timedelta(seconds=config.PAYMENT_EVENT_RETRY_DELAY * attempts)
+    else:
+        status = PaymentEvent.STATUS_FAILED
+        run_after = event.run_after
+    PaymentEvent.objects.filter(id=event.id).update(
+        status=status,
+        run_after=run_after,
+        locked_at=None,
+        last_error=error,
+    )
+
+
+@db_sync
+def transition_order_status(order_id: int, payment_id: str, status: str) -> bool:
+    changes = {'payment_status': status}
+    if status == Order.STATUS_PAID:
+        changes['paid_at'] = timezone.now()
+    updated = Order.objects.filter(
+        id=order_id,
+        yookassa_payment_id=payment_id,
+    ).exclude(payment_status=status).update(**changes)
+    return updated == 1
+
+
+async def apply_payment_status(bot: Bot, order_id: int, payment_id: str, telegram_user_id: int,
+                               status: str) -> bool:
+    if not await transition_order_status(order_id, payment_id, status):
+        return False
+
+    if status == Order.STATUS_PAID:
+        notify_order_exporter()
+
+    try:
+        await bot.send_message(
+            chat_id=telegram_user_id,
+            text=STATUS_NOTIFICATIONS[status].format(order_id=order_id)
+        )
+    except TelegramAPIError:
+        pass
+    return True
+
+
+async def _process_event(bot: Bot, event: PaymentEvent) -> tuple[str, int | None]:
+    if event.event not in EVENT_TRANSITIONS:
+        return PaymentEvent.OUTCOME_IGNORED, None
+
+    payment_data = WebhookNotificationFactory().create(event.payload).object
+    order_id = int(payment_data.metadata['order_id'])
+    applied = await apply_payment_status(
+        bot,
+        order_id,
+        payment_data.id,
+        payment_data.metadata['telegram_user_id'],
+        EVENT_TRANSITIONS[event.event],
+    )
+    if not applied:
+        return PaymentEvent.OUTCOME_SKIPPED, None
+    return PaymentEvent.OUTCOME_APPLIED, order_id
+
+
+async def process_payment_inbox(bot: Bot) -> int:
+    events = await _claim_payment_events()
+    for event in events:
+        try:
+            outcome, order_id = await _process_event(bot, event)
+        except Exception as e:
+            logger.exception("Failed to process payment event %s", event.id)
+            await _fail_event(event, repr(e))
+        else:
+            await _complete_event(event, outcome, order_id)
+    return len(events)
+
+
+async def run_payment_inbox_consumer(bot: Bot) -> None:
+    while True:
+        _inbox_wakeup.clear()
+        try:
+            await _requeue_stale_events()
+            while await process_payment_inbox(bot) == config.PAYMENT_INBOX_BATCH_SIZE:
+                pass
+        except Exception:
+            logger.exception("Payment inbox consumer failed")
+
+        try:
+            await asyncio.wait_for(_inbox_wakeup.wait(), timeout=config.PAYMENT_INBOX_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+import config
+from aiogram import Bot
+from django.db.models import F
+from django.utils import timezone
+from shop_app.models import Order
+from shop_app.ratelimit import TokenBucket
+from utils.db import db_sync
+from utils.payment_inbox import apply_payment_status
+from utils.yookassa_api import yookassa_client, YooKassaError
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STATUS_TRANSITIONS = {
+    'succeeded': Order.STATUS_PAID,
+    'canceled': Order.STATUS_CANCELED,
+}
+
+
+@db_sync
+def _get_stale_pending_orders() -> list[tuple[int, str, int]]:
+    now = timezone.now()
+    return list(Order.objects.filter(
+        payment_status=Order.STATUS_PENDING,
+        created_at__lt=now - timedelta(seconds=config.PAYMENT_RECONCILE_AFTER),
+        created_at__gte=now - timedelta(seconds=config.PAYMENT_RECONCILE_MAX_AGE),
+        yookassa_payment_id__isnull=False,
+    ).order_by(
+        F('reconciled_at').asc(nulls_first=True), 'created_at',
+    ).values_list('id', 'yookassa_payment_id', 'user_id')[:config.PAYMENT_RECONCILE_BATCH_SIZE])
+
+
+@db_sync
+def mark_orders_reconciled(order_ids: list[int]) -> None:
+    Order.objects.filter(id__in=order_ids).update(reconciled_at=timezone.now())
+
+
+async def _reconcile_order(bot: Bot, limiter: TokenBucket, semaphore: asyncio.Semaphore,
+                           order_id: int, payment_id: str, user_id: int) -> bool:
+    async with semaphore:
+        await limiter.acquire()
+        try:
+            payment = await yookassa_client.get_payment(payment_id)
+        except YooKassaError as e:
+            logger.warning("Failed to fetch payment %s for order %s: %s", payment_id, order_id, e)
+            return False
+
+    status = PAYMENT_STATUS_TRANSITIONS.get(payment.status)
+    if not status:
+        return False
+    return await apply_payment_status(bot, order_id, payment_id, user_id, status)
+
+
+async def reconcile_pending_payments(bot: Bot) -> int:
+    orders = await _get_stale_pending_orders()
+    if not orders:
+        return 0
+
+    limiter = TokenBucket(config.PAYMENT_RECONCILE_RATE_LIMIT)
+    semaphore = asyncio.Semaphore(config.PAYMENT_RECONCILE_CONCURRENCY)
+    results = await asyncio.gather(*(
+        _reconcile_order(bot, limiter, semaphore, order_id, payment_id, user_id)
+        for order_id, payment_id, user_id in orders
+    ))
+    await mark_orders_reconciled([order_id for order_id, _, _ in orders])
+    reconciled = sum(results)
+    if reconciled:
+        logger.info("Reconciled %s of %s stale pending orders", reconciled, len(orders))
+    return reconciled
+
+
+async def run_payment_reconciler(bot: Bot) -> None:
+    while True:
+        await asyncio.sleep(config.PAYMENT_RECONCILE_INTERVAL)
+        try:
+            await reconcile_pending_payments(bot)
+        except Exception:
+            logger.exception("Payment reconciliation failed")
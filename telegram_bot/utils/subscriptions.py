@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import NamedTuple
+
+import config
+from aiogram import Bot
+from aiogram.enums import ChatMemberStatus
+from aiogram.exceptions import TelegramAPIError
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+membership_cache = TTLCache(maxsize=config.MEMBERSHIP_CACHE_SIZE, ttl=config.MEMBERSHIP_CACHE_TTL)
+
+
+class ChatInfo(NamedTuple):
+    title: str
+    invite_link: str
+
+
+_chat_info: dict[str, ChatInfo] = {}
+
+
+async def _is_subscribed(bot: Bot, chat_id: str, tg_id: int) -> bool:
+    member = await bot.get_chat_member(chat_id, tg_id)
+    is_subscribed = member.status != ChatMemberStatus.LEFT
+    ttl = None if is_subscribed else config.MEMBERSHIP_NEGATIVE_CACHE_TTL
+    membership_cache.set((tg_id, chat_id), is_subscribed, ttl=ttl)
+    return is_subscribed
+
+
+async def get_unsubscribed_chat_ids(bot: Bot, tg_id: int) -> list[str]:
+    statuses = {}
+    uncached_chat_ids = []
+    for chat_id in config.REQUIRED_CHAT_IDS:
+        is_subscribed = membership_cache.get((tg_id, chat_id))
+        if is_subscribed is None:
+            uncached_chat_ids.append(chat_id)
+        else:
+            statuses[chat_id] = is_subscribed
+
+    if uncached_chat_ids:
+        results = await asyncio.gather(*(_is_subscribed(bot, chat_id, tg_id) for chat_id in uncached_chat_ids))
+        statuses.update(zip(uncached_chat_ids, results))
+
+    return [chat_id for chat_id in config.REQUIRED_CHAT_IDS if not statuses[chat_id]]
+
+
+def invalidate_membership(tg_id: int) -> None:
+    for chat_id in config.REQUIRED_CHAT_IDS:
+        membership_cache.pop((tg_id, chat_id))
+
+
+def get_chat_info(chat_id: str) -> ChatInfo | None:
+    return _chat_info.get(chat_id)
+
+
+async def _fetch_chat_info(bot: Bot, chat_id: str) -> None:
+    try:
+        chat = await bot.get_chat(chat_id)
+    except TelegramAPIError as e:
+        logger.warning("Failed to fetch chat %s: %s", chat_id, e)
+        return
+
+    if chat.title and chat.invite_link:
+        _chat_info[chat_id] = ChatInfo(title=chat.title, invite_link=chat.invite_link)
+    else:
+        _chat_info.pop(chat_id, None)
+
+
+async def refresh_chat_info(bot: Bot) -> None:
+    await asyncio.gather(*(_fetch_chat_info(bot, chat_id) for chat_id in config.REQUIRED_CHAT_IDS))
+
+
+async def run_chat_info_refresher(bot: Bot) -> None:
+    retry_delay = config.CHAT_INFO_RETRY_DELAY
+    while True:
+        if all(chat_id in _chat_info for chat_id in config.REQUIRED_CHAT_IDS):
+            retry_delay = config.CHAT_INFO_RETRY_DELAY
+            await asyncio.sleep(config.CHAT_INFO_REFRESH_INTERVAL)
+        else:
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, config.CHAT_INFO_REFRESH_INTERVAL)
+        await refresh_chat_info(bot)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import config
+from django.db import DatabaseError
+from django.utils import timezone
+from shop_app.models import TelegramUser
+
+from .cache import TTLCache
+from .db import db_sync
+
+logger = logging.getLogger(__name__)
+
+@db_sync
+def _get_or_create_user(tg_id: int, defaults: dict) -> TelegramUser:
+    user, _ = TelegramUser.objects.get_or_create(id=tg_id, defaults=defaults)
+    return user
+
+
+@db_sync
+def _bulk_upsert_users(users: list[TelegramUser]) -> None:
+    TelegramUser.objects.bulk_create(
+        users,
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=['first_name', 'last_name', 'username', 'updated_at', 'is_reachable', 'unreachable_since'],
+    )
+
+
+@db_sync
+def _set_user_reachable(tg_id: int, is_reachable: bool, unreachable_since: datetime | None) -> None:
+    TelegramUser.objects.filter(id=tg_id).update(is_reachable=is_reachable, unreachable_since=unreachable_since)
+
+
+class UserCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending: dict[int, TelegramUser] = {}
+
+    async def get_or_create(self, tg_id: int, defaults: dict) -> TelegramUser:
+        user = self._users.get(tg_id)
+        if user is not None:
+            return user
+
+        user = await _get_or_create_user(tg_id, defaults)
+        self._users.set(tg_id, user)
+        return user
+
+    async def set_reachable(self, tg_id: int, is_reachable: bool) -> None:
+        user = self._users.get(tg_id)
+        unreachable_since = None if is_reachable else timezone.now()
+        if user is not None:
+            user.is_reachable = is_reachable
+            user.unreachable_since = unreachable_since
+        await _set_user_reachable(tg_id, is_reachable, unreachable_since)
+
+    def schedule_update(self, user: TelegramUser) -> None:
+        self._pending[user.id] = user
+        self._users.set(user.id, user)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+
+        users, self._pending = list(self._pending.values()), {}
+        try:
+            await _bulk_upsert_users(users)
+        except DatabaseError:
+            for user in users:
+                self._pending.setdefault(user.id, user)
+            raise
+
+
+user_cache = UserCache(
+    maxsize=config.USER_CACHE_SIZE,
+    ttl=config.USER_CACHE_TTL,
+)
+
+
+async def run_user_flusher() -> None:
+    while True:
+        await asyncio.sleep(config.USER_FLUSH_INTERVAL)
+        try:
+            await user_cache.flush()
+        except DatabaseError:
+            logger.exception("Failed to flush pending user updates")
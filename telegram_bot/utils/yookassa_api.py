@@ -1,15 +1,95 @@
+import asyncio
+import json
+import logging
 import uuid
 
+import aiohttp
 import config
-from asgiref.sync import sync_to_async
-from yookassa import Configuration, Payment
+from utils.metrics import histogram
 from yookassa.domain.request import PaymentRequest
 from yookassa.domain.response import PaymentResponse
 
+logger = logging.getLogger(__name__)
 
-def setup_yookassa_configuration():
-    Configuration.account_id = config.YOOKASSA_SHOP_ID
-    Configuration.secret_key = config.YOOKASSA_SECRET_KEY
+RETRYABLE_STATUSES = {202, 429, 500, 502, 503, 504}
+
+request_duration = histogram(
+    "yookassa_request_duration_seconds",
+    "Latency of YooKassa API requests, including failed attempts",
+)
+
+
+class YooKassaError(Exception):
+    def __init__(self, message: str, status: int | None = None, content: dict | None = None):
+        super().__init__(message)
+        self.status = status
+        self.content = content or {}
+
+
+class YooKassaClient:
+    def __init__(self):
+        self._session: aiohttp.ClientSession | None = None
+
+    async def start(self) -> None:
+        if self._session and not self._session.closed:
+            return
+        self._session = aiohttp.ClientSession(
+            base_url=config.YOOKASSA_API_URL.rstrip('/') + '/',
+            auth=aiohttp.BasicAuth(str(config.YOOKASSA_SHOP_ID), config.YOOKASSA_SECRET_KEY or ''),
+            timeout=aiohttp.ClientTimeout(total=config.YOOKASSA_TIMEOUT, connect=config.YOOKASSA_CONNECT_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=config.YOOKASSA_POOL_SIZE, keepalive_timeout=60),
+            headers={'Content-Type': 'application/json'},
+        )
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method: str, path: str, body: str | None = None,
+                       idempotence_key: str | None = None) -> dict:
+        await self.start()
+        headers = {'Idempotence-Key': idempotence_key} if idempotence_key else None
+        last_error: YooKassaError | None = None
+
+        for attempt in range(config.YOOKASSA_MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(config.YOOKASSA_RETRY_DELAY * 2 ** (attempt - 1))
+
+            started = asyncio.get_running_loop().time()
+            try:
+                async with self._session.request(method, path, data=body, headers=headers) as response:
+                    content = await response.json(content_type=None)
+                    if response.status == 200:
+                        return content
+                    error = YooKassaError(
+                        (content or {}).get('description', f"HTTP {response.status}"),
+                        status=response.status,
+                        content=content,
+                    )
+                    if response.status not in RETRYABLE_STATUSES:
+                        raise error
+                    last_error = error
+            except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+                last_error = YooKassaError(repr(e))
+            finally:
+                request_duration.observe(asyncio.get_running_loop().time() - started)
+
+            logger.warning("YooKassa %s %s failed (attempt %s): %s", method, path, attempt + 1, last_error)
+
+        raise last_error
+
+    async def create_payment(self, request: PaymentRequest, idempotence_key: str) -> PaymentResponse:
+        request.validate()
+        content = await self._request('POST', 'payments', body=request.json(), idempotence_key=idempotence_key)
+        return PaymentResponse(content)
+
+    async def get_payment(self, payment_id: str) -> PaymentResponse:
+        content = await self._request('GET', f'payments/{payment_id}')
+        return PaymentResponse(content)
+
+
+yookassa_client = YooKassaClient()
 
 
 async def create_yookassa_payment(
@@ -18,7 +98,6 @@ async def create_yookassa_payment(
         order_id: int,
         telegram_user_id: int
 ) -> PaymentResponse:
-    idempotence_key = str(uuid.uuid4())
     request = PaymentRequest({
         "amount": {
             "value": str(amount),
@@ -36,5 +115,4 @@ async def create_yookassa_payment(
         }
     })
 
-    yookassa_payment: PaymentResponse = await sync_to_async(Payment.create)(request, idempotence_key)
-    return yookassa_payment
+    return await yookassa_client.create_payment(request, idempotence_key=str(uuid.uuid4()))